@@ -1,7 +1,9 @@
-from flask import Flask, request, jsonify, send_file, render_template_string
+from flask import Flask, request, jsonify, send_file, Response
 from flask_cors import CORS
 import os
 import base64
+import hashlib
+import json
 from datetime import datetime
 from io import BytesIO
 from PIL import Image, ImageDraw
@@ -9,6 +11,12 @@ import random
 
 # Import our image processor
 from image_processor import AdvancedImageProcessor
+from frame_pipeline import FramePipeline, ZipSink, COHERENCE_MODES
+from static_assets import StaticAsset
+from procedural import GENERATOR_STYLES, generator
+from profiling import (
+    ProfilingForbidden, is_admin, list_profiles, profile_path, profile_request_for, profiled_call
+)
 
 app = Flask(__name__)
 CORS(app)
@@ -17,6 +25,9 @@ CORS(app)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['RESULTS_FOLDER'] = 'results'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
+# /api/stylize-frames answers with the whole sequence in memory, so cap it
+app.config['MAX_FRAMES'] = 300
+app.config['MAX_FRAME_PIXELS'] = 100 * 1000 * 1000  # total over all frames
 
 # Create directories
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -25,13 +36,43 @@ os.makedirs(app.config['RESULTS_FOLDER'], exist_ok=True)
 # Initialize the art generator
 art_generator = AdvancedImageProcessor()
 
+# Styles for /api/generate-from-text: the drawn originals plus the
+# procedural noise engine (any other name falls back to a colourful pattern)
+PROMPT_STYLES = {
+    'abstract': 'Random lines and circles',
+    'landscape': 'Simple sky, sun and mountains',
+    'geometric': 'Grid of squares and circles',
+    **GENERATOR_STYLES
+}
+
+# Set once warm_up() has run; /readyz reports it
+app.config['READY'] = False
+
+def warm_up():
+    """Load everything a worker needs before it serves traffic
+
+    Production mode (wsgi.py) calls this in the gunicorn master before
+    forking, so the imported modules, codec plugins and the processor are
+    shared copy-on-write by every worker.
+    """
+    # Register all PIL codec plugins now rather than on the first request
+    Image.init()
+    
+    # Run each style once on a tiny image so lazy imports and tables load
+    sample = Image.new('RGB', (16, 16), 'gray')
+    for style_name in art_generator.get_available_styles():
+        art_generator.process_image(sample, style_name, seed=0)
+    sample.save(BytesIO(), format='PNG')
+    
+    app.config['READY'] = True
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in {'png', 'jpg', 'jpeg', 'gif'}
 
-def process_uploaded_file(file):
+def process_uploaded_file(stream):
     """Process uploaded image file"""
-    image = Image.open(file.stream)
+    image = Image.open(stream)
     
     # Convert to RGB if necessary
     if image.mode != 'RGB':
@@ -39,459 +80,139 @@ def process_uploaded_file(file):
     
     return image
 
-# HTML Interface
-HTML_TEMPLATE = '''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>AI Art Generator</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: 'Arial', sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-        
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 15px;
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }
-        
-        .header {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }
-        
-        .header h1 {
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }
-        
-        .header p {
-            font-size: 1.2em;
-            opacity: 0.9;
-        }
-        
-        .content {
-            padding: 30px;
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 30px;
-        }
-        
-        @media (max-width: 768px) {
-            .content {
-                grid-template-columns: 1fr;
-            }
-        }
-        
-        .upload-section, .result-section {
-            background: #f8f9fa;
-            padding: 25px;
-            border-radius: 10px;
-            border: 2px dashed #dee2e6;
-        }
-        
-        .section-title {
-            font-size: 1.5em;
-            margin-bottom: 20px;
-            color: #495057;
-            border-bottom: 2px solid #667eea;
-            padding-bottom: 10px;
-        }
-        
-        .file-input {
-            width: 100%;
-            padding: 15px;
-            border: 2px dashed #667eea;
-            border-radius: 8px;
-            background: #f8f9ff;
-            margin-bottom: 20px;
-            text-align: center;
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-        
-        .file-input:hover {
-            background: #e9ecef;
-            border-color: #5a67d8;
-        }
-        
-        .style-selector {
-            width: 100%;
-            padding: 12px;
-            border: 2px solid #dee2e6;
-            border-radius: 8px;
-            font-size: 16px;
-            margin-bottom: 20px;
-            background: white;
-        }
-        
-        .style-selector:focus {
-            outline: none;
-            border-color: #667eea;
-        }
-        
-        .btn {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border: none;
-            padding: 15px 30px;
-            border-radius: 8px;
-            font-size: 16px;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            width: 100%;
-            margin-bottom: 10px;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 10px 20px rgba(102, 126, 234, 0.3);
-        }
-        
-        .btn:disabled {
-            background: #6c757d;
-            cursor: not-allowed;
-            transform: none;
-            box-shadow: none;
-        }
-        
-        .image-preview {
-            width: 100%;
-            max-height: 300px;
-            border-radius: 8px;
-            border: 2px solid #dee2e6;
-            margin-bottom: 20px;
-            display: none;
-        }
-        
-        .result-image {
-            width: 100%;
-            max-height: 400px;
-            border-radius: 8px;
-            border: 2px solid #28a745;
-            display: none;
-        }
-        
-        .loading {
-            display: none;
-            text-align: center;
-            padding: 20px;
-        }
-        
-        .spinner {
-            border: 4px solid #f3f3f3;
-            border-top: 4px solid #667eea;
-            border-radius: 50%;
-            width: 40px;
-            height: 40px;
-            animation: spin 1s linear infinite;
-            margin: 0 auto 15px;
-        }
-        
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-        
-        .message {
-            padding: 15px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-            display: none;
-        }
-        
-        .success {
-            background: #d4edda;
-            color: #155724;
-            border: 1px solid #c3e6cb;
-        }
-        
-        .error {
-            background: #f8d7da;
-            color: #721c24;
-            border: 1px solid #f5c6cb;
-        }
-        
-        .styles-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
-            gap: 10px;
-            margin-bottom: 20px;
-        }
-        
-        .style-option {
-            padding: 10px;
-            border: 2px solid #dee2e6;
-            border-radius: 8px;
-            text-align: center;
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-        
-        .style-option:hover {
-            border-color: #667eea;
-            background: #f8f9ff;
-        }
-        
-        .style-option.selected {
-            border-color: #667eea;
-            background: #667eea;
-            color: white;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🎨 AI Art Generator</h1>
-            <p>Transform your images with AI-powered artistic styles</p>
-        </div>
-        
-        <div class="content">
-            <!-- Upload Section -->
-            <div class="upload-section">
-                <h2 class="section-title">Upload & Style</h2>
-                
-                <div class="message" id="message"></div>
-                
-                <input type="file" id="imageInput" accept="image/*" class="file-input">
-                
-                <div id="imagePreviewContainer">
-                    <img id="imagePreview" class="image-preview" alt="Image preview">
-                </div>
-                
-                <h3>Choose Art Style:</h3>
-                <div class="styles-grid" id="stylesGrid">
-                    <!-- Styles will be loaded here -->
-                </div>
-                
-                <select id="styleSelect" class="style-selector">
-                    <!-- Options will be loaded here -->
-                </select>
-                
-                <button id="generateBtn" class="btn" disabled>
-                    🎨 Generate Art
-                </button>
-                
-                <div class="loading" id="loading">
-                    <div class="spinner"></div>
-                    <p>Creating your masterpiece...</p>
-                </div>
-            </div>
-            
-            <!-- Result Section -->
-            <div class="result-section">
-                <h2 class="section-title">Your Artwork</h2>
-                
-                <div id="resultContainer">
-                    <img id="resultImage" class="result-image" alt="Generated artwork">
-                </div>
-                
-                <div id="resultInfo" style="display: none;">
-                    <p><strong>Style Applied:</strong> <span id="appliedStyle"></span></p>
-                    <p><strong>Original Size:</strong> <span id="originalSize"></span></p>
-                    <button id="downloadBtn" class="btn">💾 Download Image</button>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        let selectedStyle = 'oil_painting';
-        let currentResultImage = null;
-        
-        // Load available styles
-        async function loadStyles() {
-            try {
-                const response = await fetch('/api/styles');
-                const data = await response.json();
-                
-                if (data.success) {
-                    const styles = data.styles;
-                    const stylesGrid = document.getElementById('stylesGrid');
-                    const styleSelect = document.getElementById('styleSelect');
-                    
-                    // Clear existing options
-                    stylesGrid.innerHTML = '';
-                    styleSelect.innerHTML = '';
-                    
-                    // Populate styles grid and dropdown
-                    Object.entries(styles).forEach(([key, value]) => {
-                        // Grid option
-                        const styleDiv = document.createElement('div');
-                        styleDiv.className = 'style-option';
-                        styleDiv.textContent = value;
-                        styleDiv.dataset.style = key;
-                        styleDiv.onclick = () => selectStyle(key, styleDiv);
-                        stylesGrid.appendChild(styleDiv);
-                        
-                        // Dropdown option
-                        const option = document.createElement('option');
-                        option.value = key;
-                        option.textContent = value;
-                        styleSelect.appendChild(option);
-                    });
-                    
-                    // Select first style by default
-                    if (Object.keys(styles).length > 0) {
-                        selectStyle(Object.keys(styles)[0], stylesGrid.firstChild);
-                    }
-                }
-            } catch (error) {
-                showMessage('Error loading styles: ' + error.message, 'error');
-            }
-        }
-        
-        function selectStyle(style, element) {
-            selectedStyle = style;
-            
-            // Update visual selection
-            document.querySelectorAll('.style-option').forEach(opt => {
-                opt.classList.remove('selected');
-            });
-            element.classList.add('selected');
-            
-            // Update dropdown
-            document.getElementById('styleSelect').value = style;
-        }
-        
-        // File input handling
-        document.getElementById('imageInput').addEventListener('change', function(e) {
-            const file = e.target.files[0];
-            if (file) {
-                const reader = new FileReader();
-                reader.onload = function(e) {
-                    const preview = document.getElementById('imagePreview');
-                    preview.src = e.target.result;
-                    preview.style.display = 'block';
-                    document.getElementById('generateBtn').disabled = false;
-                };
-                reader.readAsDataURL(file);
-            }
-        });
-        
-        // Style select change
-        document.getElementById('styleSelect').addEventListener('change', function(e) {
-            selectedStyle = e.target.value;
-            
-            // Update grid selection
-            document.querySelectorAll('.style-option').forEach(opt => {
-                opt.classList.remove('selected');
-                if (opt.dataset.style === selectedStyle) {
-                    opt.classList.add('selected');
-                }
-            });
-        });
-        
-        // Generate art
-        document.getElementById('generateBtn').addEventListener('click', async function() {
-            const fileInput = document.getElementById('imageInput');
-            const file = fileInput.files[0];
-            
-            if (!file) {
-                showMessage('Please select an image first!', 'error');
-                return;
-            }
-            
-            const loading = document.getElementById('loading');
-            const generateBtn = document.getElementById('generateBtn');
-            
-            // Show loading state
-            loading.style.display = 'block';
-            generateBtn.disabled = true;
-            generateBtn.textContent = 'Generating...';
-            
-            try {
-                const formData = new FormData();
-                formData.append('image', file);
-                formData.append('style_name', selectedStyle);
-                
-                const response = await fetch('/api/apply-style', {
-                    method: 'POST',
-                    body: formData
-                });
-                
-                const data = await response.json();
-                
-                if (data.success) {
-                    // Display result
-                    const resultImage = document.getElementById('resultImage');
-                    resultImage.src = data.image;
-                    resultImage.style.display = 'block';
-                    
-                    // Show result info
-                    document.getElementById('appliedStyle').textContent = data.style_applied;
-                    document.getElementById('originalSize').textContent = data.original_size;
-                    document.getElementById('resultInfo').style.display = 'block';
-                    
-                    currentResultImage = data.image;
-                    
-                    showMessage(data.message, 'success');
-                } else {
-                    showMessage(data.error || 'Generation failed!', 'error');
-                }
-            } catch (error) {
-                showMessage('Error: ' + error.message, 'error');
-            } finally {
-                // Hide loading state
-                loading.style.display = 'none';
-                generateBtn.disabled = false;
-                generateBtn.textContent = '🎨 Generate Art';
-            }
-        });
-        
-        // Download result
-        document.getElementById('downloadBtn').addEventListener('click', function() {
-            if (currentResultImage) {
-                const link = document.createElement('a');
-                link.href = currentResultImage;
-                link.download = 'ai_artwork.png';
-                link.click();
-            }
-        });
-        
-        function showMessage(text, type) {
-            const messageDiv = document.getElementById('message');
-            messageDiv.textContent = text;
-            messageDiv.className = `message ${type}`;
-            messageDiv.style.display = 'block';
-            
-            // Auto-hide success messages after 5 seconds
-            if (type === 'success') {
-                setTimeout(() => {
-                    messageDiv.style.display = 'none';
-                }, 5000);
-            }
-        }
-        
-        // Initialize
-        loadStyles();
-    </script>
-</body>
-</html>
-'''
+def parse_style_params(form):
+    """Read style parameters from a form: a JSON 'params' object plus an optional 'strength'"""
+    try:
+        params = json.loads(form.get('params') or '{}')
+    except ValueError:
+        raise ValueError("params must be a JSON object")
+    if not isinstance(params, dict):
+        raise ValueError("params must be a JSON object")
+    
+    if form.get('strength') not in (None, ''):
+        params['strength'] = form.get('strength')
+    return params
+
+def parse_style_chain(form):
+    """Read an optional 'styles' chain: a JSON list or comma-separated style names"""
+    raw = (form.get('styles') or '').strip()
+    if not raw:
+        return None
+    
+    if raw.startswith('['):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise ValueError("styles must be a JSON list or comma-separated style names")
+    return [name.strip() for name in raw.split(',') if name.strip()]
+
+def render_style_chain(image_data, steps):
+    """Decode uploaded image bytes, run the style chain and encode as PNG
+
+    This is all the CPU work of /api/apply-style, kept free of request
+    objects so the async app (asgi_app.py) can run it in an executor.
+    Returns (png_bytes, original_size).
+    """
+    original_image = process_uploaded_file(BytesIO(image_data))
+    styled_image = art_generator.process_chain(original_image, steps)
+    
+    buffered = BytesIO()
+    styled_image.save(buffered, format="PNG")
+    return buffered.getvalue(), f"{original_image.width}x{original_image.height}"
+
+def render_prompt(prompt, style, width, height, zoom=0):
+    """Generate artwork from a prompt and encode it as PNG bytes"""
+    generated_image = generate_art_from_prompt(prompt, style, width, height, zoom)
+    
+    buffered = BytesIO()
+    generated_image.save(buffered, format="PNG")
+    return buffered.getvalue()
+
+def save_result(filename, data):
+    """Write encoded result bytes into the results folder"""
+    result_path = os.path.join(app.config['RESULTS_FOLDER'], filename)
+    with open(result_path, 'wb') as f:
+        f.write(data)
+
+def style_result_filename(steps):
+    style_name = '+'.join(name for name, _ in steps)
+    # Keep long chains to a short, still distinct name
+    if len(style_name) > 48:
+        digest = hashlib.sha1(style_name.encode()).hexdigest()[:10]
+        style_name = f"{steps[0][0]}+{len(steps) - 1}more_{digest}"
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f"{style_name}_{timestamp}.png"
+
+def style_response(png_bytes, filename, steps, original_size):
+    """JSON body for a successful /api/apply-style"""
+    style_name = '+'.join(name for name, _ in steps)
+    img_str = base64.b64encode(png_bytes).decode()
+    return {
+        "success": True,
+        "image": f"data:image/png;base64,{img_str}",
+        "filename": filename,
+        "style_applied": style_name,
+        "params": steps[0][1] if len(steps) == 1 else None,
+        "steps": [{"style": name, "params": step_params} for name, step_params in steps],
+        "original_size": original_size,
+        "message": f"Successfully applied {style_name} effect!"
+    }
+
+def prompt_result_filename(style):
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f"generated_{style}_{timestamp}.png"
+
+def prompt_response(png_bytes, filename, prompt, style):
+    """JSON body for a successful /api/generate-from-text"""
+    img_str = base64.b64encode(png_bytes).decode()
+    return {
+        "success": True,
+        "image": f"data:image/png;base64,{img_str}",
+        "filename": filename,
+        "prompt": prompt,
+        "style": style,
+        "message": f"Generated {style} art from: '{prompt}'"
+    }
+
+def with_profile(body, profile_request, profile):
+    """Add profile metadata to a response body when the caller asked for it"""
+    if profile is not None and profile_request.requested:
+        body["profile"] = profile
+    return body
+
+def styles_response():
+    """JSON body for /api/styles"""
+    return {
+        "success": True,
+        "styles": art_generator.get_available_styles(),
+        "schema": {
+            name: info['params']
+            for name, info in art_generator.get_available_styles(include_params=True).items()
+        },
+        "generators": PROMPT_STYLES
+    }
+
+# The UI page and the styles list never change while running, so compress
+# them once here (before workers fork) and answer repeat visits with 304s
+ui_asset = StaticAsset.from_file(os.path.join(app.static_folder, 'index.html'),
+                                 'text/html; charset=utf-8')
+styles_asset = StaticAsset.from_json(styles_response(), cache_control='public, max-age=300')
+
+def asset_response(asset):
+    """Serve a StaticAsset, honouring Accept-Encoding and If-None-Match"""
+    status, headers, body = asset.respond(request.headers.get('Accept-Encoding'),
+                                          request.headers.get('If-None-Match'))
+    return Response(body, status=status, headers=headers)
+
+def request_profile(label, result_filename):
+    """ProfileRequest for this request (?profile=1|sample, or sampled), or None"""
+    return profile_request_for(request.args.get('profile'), request.headers.get('X-Admin-Token'),
+                               label, result_filename)
 
 @app.route('/')
 def home():
     """Serve the HTML interface"""
-    return render_template_string(HTML_TEMPLATE)
+    return asset_response(ui_asset)
 
 @app.route('/api/apply-style', methods=['POST'])
 def apply_style():
@@ -501,6 +222,7 @@ def apply_style():
         
         file = request.files['image']
         style_name = request.form.get('style_name', 'oil_painting')
+        chain = parse_style_chain(request.form)
         
         if not file or file.filename == '':
             return jsonify({"error": "No file selected"}), 400
@@ -508,32 +230,81 @@ def apply_style():
         if not allowed_file(file.filename):
             return jsonify({"error": "Invalid file type. Only JPG, PNG, GIF allowed."}), 400
         
-        # Process the uploaded image
-        original_image = process_uploaded_file(file)
+        # A 'styles' chain carries its own per-step params; otherwise it is
+        # a single style with the form's params. Validate before decoding.
+        if chain is None:
+            chain = [(style_name, parse_style_params(request.form))]
+        steps = art_generator.resolve_chain(chain)
+        
+        result_filename = style_result_filename(steps)
+        profile_request = request_profile('apply-style', result_filename)
         
-        # Apply the selected style using our image processor
-        styled_image = art_generator.process_image(original_image, style_name)
+        # Decode, apply the styles in memory and encode once
+        (png_bytes, original_size), profile = profiled_call(
+            profile_request, render_style_chain, file.read(), steps)
+        
+        # Save the result, reusing the encoded bytes
+        save_result(result_filename, png_bytes)
+        
+        return jsonify(with_profile(style_response(png_bytes, result_filename, steps, original_size),
+                                    profile_request, profile))
+        
+    except ProfilingForbidden as e:
+        return jsonify({"error": str(e)}), 403
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Processing error: {str(e)}"}), 500
+
+@app.route('/api/stylize-frames', methods=['POST'])
+def stylize_frames():
+    """Stylize every frame of an uploaded zip/tar archive"""
+    try:
+        if 'frames' not in request.files:
+            return jsonify({"error": "No frames archive provided"}), 400
+        
+        file = request.files['frames']
+        style_name = request.form.get('style_name', 'oil_painting')
+        coherence = request.form.get('coherence', 'fixed')
+        seed = int(request.form.get('seed', 0))
+        params = parse_style_params(request.form)
+        
+        if not file or file.filename == '':
+            return jsonify({"error": "No file selected"}), 400
+        
+        if coherence not in COHERENCE_MODES:
+            return jsonify({"error": f"Invalid coherence. Use one of: {', '.join(COHERENCE_MODES)}"}), 400
+        
+        pipeline = FramePipeline(style_name, processor=art_generator, params=params,
+                                 coherence=coherence, seed=seed,
+                                 max_frames=app.config['MAX_FRAMES'],
+                                 max_pixels=app.config['MAX_FRAME_PIXELS'])
+        
+        # Run the pipeline straight into an in-memory zip
+        archive = BytesIO()
+        stats = pipeline.run(BytesIO(file.read()), ZipSink(archive))
         
         # Save the result
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        result_filename = f"{style_name}_{timestamp}.png"
-        result_path = os.path.join(app.config['RESULTS_FOLDER'], result_filename)
-        styled_image.save(result_path, 'PNG')
+        result_filename = f"frames_{style_name}_{timestamp}.zip"
+        save_result(result_filename, archive.getvalue())
         
-        # Convert to base64 for response
-        buffered = BytesIO()
-        styled_image.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
+        archive_str = base64.b64encode(archive.getvalue()).decode()
         
         return jsonify({
             "success": True,
-            "image": f"data:image/png;base64,{img_str}",
+            "archive": f"data:application/zip;base64,{archive_str}",
             "filename": result_filename,
             "style_applied": style_name,
-            "original_size": f"{original_image.width}x{original_image.height}",
-            "message": f"Successfully applied {style_name} effect!"
+            "frames": stats["frames"],
+            "errors": stats["errors"],
+            "elapsed_seconds": stats["elapsed_seconds"],
+            "fps": stats["fps"],
+            "message": f"Stylized {stats['frames']} frames with {style_name} at {stats['fps']} fps"
         })
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Processing error: {str(e)}"}), 500
 
@@ -545,35 +316,37 @@ def generate_from_text():
         style = data.get('style', 'abstract')
         width = data.get('width', 512)
         height = data.get('height', 512)
+        zoom = data.get('zoom', 0)
+        
+        result_filename = prompt_result_filename(style)
+        profile_request = request_profile('generate-from-text', result_filename)
         
         # Generate art based on text description
-        generated_image = generate_art_from_prompt(prompt, style, width, height)
+        png_bytes, profile = profiled_call(profile_request, render_prompt,
+                                           prompt, style, width, height, zoom)
         
         # Save the result
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        result_filename = f"generated_{style}_{timestamp}.png"
-        result_path = os.path.join(app.config['RESULTS_FOLDER'], result_filename)
-        generated_image.save(result_path, 'PNG')
+        save_result(result_filename, png_bytes)
         
-        # Convert to base64 for response
-        buffered = BytesIO()
-        generated_image.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
-        
-        return jsonify({
-            "success": True,
-            "image": f"data:image/png;base64,{img_str}",
-            "filename": result_filename,
-            "prompt": prompt,
-            "style": style,
-            "message": f"Generated {style} art from: '{prompt}'"
-        })
+        return jsonify(with_profile(prompt_response(png_bytes, result_filename, prompt, style),
+                                    profile_request, profile))
         
+    except ProfilingForbidden as e:
+        return jsonify({"error": str(e)}), 403
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Generation error: {str(e)}"}), 500
 
-def generate_art_from_prompt(prompt, style, width, height):
+def generate_art_from_prompt(prompt, style, width, height, zoom=0):
     """Generate artwork from text prompt"""
+    if not isinstance(prompt, str):
+        raise ValueError("Prompt must be a string")
+    
+    # Noise-based styles come from the tile-cached procedural engine
+    if style in GENERATOR_STYLES:
+        return generator.render(prompt, style, width, height, zoom)
+    
     # Create a new image
     image = Image.new('RGB', (width, height), 'black')
     draw = ImageDraw.Draw(image)
@@ -661,13 +434,44 @@ def generate_art_from_prompt(prompt, style, width, height):
     
     return image
 
+@app.route('/healthz', methods=['GET'])
+def liveness():
+    """Liveness probe: the process is up and answering"""
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz', methods=['GET'])
+def readiness():
+    """Readiness probe: warmed up and able to save results"""
+    checks = {
+        "warmed_up": app.config['READY'],
+        "results_writable": os.access(app.config['RESULTS_FOLDER'], os.W_OK)
+    }
+    ready = all(checks.values())
+    return jsonify({"status": "ready" if ready else "not ready", "checks": checks}), (200 if ready else 503)
+
 @app.route('/api/styles', methods=['GET'])
 def get_available_styles():
     """Return list of available artistic styles"""
-    return jsonify({
-        "success": True,
-        "styles": art_generator.get_available_styles()
-    })
+    return asset_response(styles_asset)
+
+@app.route('/api/profiles', methods=['GET'])
+def get_profiles():
+    """List recently captured request profiles (admin only)"""
+    if not is_admin(request.headers.get('X-Admin-Token')):
+        return jsonify({"error": "Admin token required"}), 403
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify({"success": True, "profiles": list_profiles(limit)})
+
+@app.route('/api/profiles/<profile_id>.<fmt>', methods=['GET'])
+def download_profile(profile_id, fmt):
+    """Download a stored profile as .pstats or .collapsed (admin only)"""
+    if not is_admin(request.headers.get('X-Admin-Token')):
+        return jsonify({"error": "Admin token required"}), 403
+    path = profile_path(profile_id, fmt)
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return send_file(path, mimetype='application/octet-stream' if fmt == 'pstats' else 'text/plain',
+                     as_attachment=True)
 
 if __name__ == '__main__':
     print("🎨 Advanced AI Art Generator Starting...")
@@ -677,6 +481,8 @@ if __name__ == '__main__':
     print("✨ Available Styles:", list(art_generator.get_available_styles().keys()))
     print("-" * 50)
     print("🌐 Open your browser and go to: http://localhost:5000")
+    print("🚀 For production use: gunicorn -c gunicorn.conf.py wsgi:application")
     print("-" * 50)
     
+    warm_up()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""Asynchronous (ASGI) variant of the API.
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+
+The event loop only does I/O - receiving uploads, sending responses and
+holding idle or slow connections - so one process can keep thousands of
+them open. Decoding, styling, encoding and saving results run in an
+executor, configured from the environment:
+
+    ASGI_EXECUTOR           'thread' (default) or 'process'
+    ASGI_EXECUTOR_WORKERS   pool size (default: CPU count)
+
+Threads work well because PIL and NumPy release the GIL in their heavy
+loops; processes sidestep the GIL entirely at the cost of pickling the
+image bytes to and from the workers.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from quart import Quart, Response, jsonify, request, send_file
+from quart_cors import cors
+
+import app as sync_app
+from app import (
+    allowed_file, art_generator, parse_style_chain, parse_style_params, prompt_response,
+    prompt_result_filename, render_prompt, render_style_chain, save_result, style_response,
+    style_result_filename, styles_asset, ui_asset, warm_up, with_profile
+)
+from profiling import (
+    ProfilingForbidden, is_admin, list_profiles, profile_path, profile_request_for, profiled_call
+)
+
+app = cors(Quart(__name__))
+app.config['MAX_CONTENT_LENGTH'] = sync_app.app.config['MAX_CONTENT_LENGTH']
+
+# Set once the executor is up and warmed; /readyz reports it
+app.config['READY'] = False
+
+# Created when serving starts so importing this module (e.g. in a process
+# pool worker) never spins up another pool
+executor = None
+
+def _make_executor():
+    kind = os.environ.get('ASGI_EXECUTOR', 'thread')
+    workers = int(os.environ.get('ASGI_EXECUTOR_WORKERS', 0)) or os.cpu_count() or 2
+
+    if kind == 'process':
+        return ProcessPoolExecutor(max_workers=workers, initializer=warm_up)
+    if kind == 'thread':
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='art-cpu')
+    raise ValueError(f"ASGI_EXECUTOR must be 'thread' or 'process', not '{kind}'")
+
+async def run_cpu(func, *args):
+    """Run blocking work in the executor and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
+
+@app.before_serving
+async def start_executor():
+    global executor
+    executor = _make_executor()
+    if isinstance(executor, ThreadPoolExecutor):
+        # Thread workers share this process, so warm it up once
+        await run_cpu(warm_up)
+    else:
+        # Start a worker process; its initializer warms it up
+        await run_cpu(os.getpid)
+    app.config['READY'] = True
+
+@app.after_serving
+async def stop_executor():
+    app.config['READY'] = False
+    executor.shutdown(wait=True)
+
+# Executor jobs: everything after the request is read, up to the response body.
+# Profiling happens here too, so it captures the thread or process doing the work.
+
+def apply_style_job(image_data, steps, result_filename, profile_request):
+    (png_bytes, original_size), profile = profiled_call(
+        profile_request, render_style_chain, image_data, steps)
+    save_result(result_filename, png_bytes)
+    return with_profile(style_response(png_bytes, result_filename, steps, original_size),
+                        profile_request, profile)
+
+def generate_from_text_job(prompt, style, width, height, zoom, result_filename, profile_request):
+    png_bytes, profile = profiled_call(profile_request, render_prompt, prompt, style, width, height, zoom)
+    save_result(result_filename, png_bytes)
+    return with_profile(prompt_response(png_bytes, result_filename, prompt, style),
+                        profile_request, profile)
+
+def request_profile(label, result_filename):
+    """ProfileRequest for this request (?profile=1|sample, or sampled), or None"""
+    return profile_request_for(request.args.get('profile'), request.headers.get('X-Admin-Token'),
+                               label, result_filename)
+
+@app.route('/api/apply-style', methods=['POST'])
+async def apply_style():
+    try:
+        files = await request.files
+        form = await request.form
+
+        if 'image' not in files:
+            return jsonify({"error": "No image file provided"}), 400
+
+        file = files['image']
+        style_name = form.get('style_name', 'oil_painting')
+        chain = parse_style_chain(form)
+
+        if not file or file.filename == '':
+            return jsonify({"error": "No file selected"}), 400
+
+        if not allowed_file(file.filename):
+            return jsonify({"error": "Invalid file type. Only JPG, PNG, GIF allowed."}), 400
+
+        # Validate on the loop (cheap) so bad requests never reach the executor
+        if chain is None:
+            chain = [(style_name, parse_style_params(form))]
+        steps = art_generator.resolve_chain(chain)
+
+        result_filename = style_result_filename(steps)
+        profile_request = request_profile('apply-style', result_filename)
+
+        return jsonify(await run_cpu(apply_style_job, file.read(), steps, result_filename, profile_request))
+
+    except ProfilingForbidden as e:
+        return jsonify({"error": str(e)}), 403
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Processing error: {str(e)}"}), 500
+
+@app.route('/api/generate-from-text', methods=['POST'])
+async def generate_from_text():
+    try:
+        data = await request.get_json()
+        prompt = data.get('prompt', 'Abstract art')
+        style = data.get('style', 'abstract')
+        width = data.get('width', 512)
+        height = data.get('height', 512)
+        zoom = data.get('zoom', 0)
+
+        result_filename = prompt_result_filename(style)
+        profile_request = request_profile('generate-from-text', result_filename)
+
+        return jsonify(await run_cpu(generate_from_text_job, prompt, style, width, height, zoom,
+                                     result_filename, profile_request))
+
+    except ProfilingForbidden as e:
+        return jsonify({"error": str(e)}), 403
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"Generation error: {str(e)}"}), 500
+
+def asset_response(asset):
+    """Serve a StaticAsset, honouring Accept-Encoding and If-None-Match"""
+    status, headers, body = asset.respond(request.headers.get('Accept-Encoding'),
+                                          request.headers.get('If-None-Match'))
+    return Response(body, status=status, headers=headers)
+
+@app.route('/')
+async def home():
+    """Serve the HTML interface"""
+    return asset_response(ui_asset)
+
+@app.route('/healthz', methods=['GET'])
+async def liveness():
+    """Liveness probe: the event loop is up and answering"""
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz', methods=['GET'])
+async def readiness():
+    """Readiness probe: executor warmed up and able to save results"""
+    checks = {
+        "warmed_up": app.config['READY'],
+        "results_writable": os.access(sync_app.app.config['RESULTS_FOLDER'], os.W_OK)
+    }
+    ready = all(checks.values())
+    return jsonify({"status": "ready" if ready else "not ready", "checks": checks}), (200 if ready else 503)
+
+@app.route('/api/styles', methods=['GET'])
+async def get_available_styles():
+    """Return list of available artistic styles"""
+    return asset_response(styles_asset)
+
+@app.route('/api/profiles', methods=['GET'])
+async def get_profiles():
+    """List recently captured request profiles (admin only)"""
+    if not is_admin(request.headers.get('X-Admin-Token')):
+        return jsonify({"error": "Admin token required"}), 403
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify({"success": True, "profiles": list_profiles(limit)})
+
+@app.route('/api/profiles/<profile_id>.<fmt>', methods=['GET'])
+async def download_profile(profile_id, fmt):
+    """Download a stored profile as .pstats or .collapsed (admin only)"""
+    if not is_admin(request.headers.get('X-Admin-Token')):
+        return jsonify({"error": "Admin token required"}), 403
+    path = profile_path(profile_id, fmt)
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return await send_file(path, mimetype='application/octet-stream' if fmt == 'pstats' else 'text/plain',
+                           as_attachment=True)
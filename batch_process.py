@@ -0,0 +1,237 @@
+"""Offline bulk stylization of directory trees.
+
+Every image under the source tree is rendered once per requested style into
+<output>/<style>/<relative path>.png using a process pool. The source
+extension is kept (a.jpg becomes a.jpg.png) so a.png and a.jpg never share an
+output. Finished jobs are appended to a JSON-lines manifest, so re-running
+the same command skips work that is already done and an interrupted run
+resumes where it stopped.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from PIL import Image
+
+from frame_pipeline import is_frame_name
+from image_processor import AdvancedImageProcessor
+
+MANIFEST_NAME = '.manifest.jsonl'
+
+# Per-process processor, created once by the pool initializer
+_processor = None
+
+
+def _init_worker():
+    global _processor
+    _processor = AdvancedImageProcessor()
+
+
+def _render(job):
+    """Apply one style to one file (runs inside a pool worker)"""
+    source_path, output_path, style_name, params, seed, output_format = job
+
+    image = Image.open(source_path)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    styled = _processor.process_image(image, style_name, params=params, seed=seed)
+
+    # Write to a temporary name first so an interrupted run never leaves
+    # a truncated file behind under the final name
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    temp_path = output_path + '.part'
+    styled.save(temp_path, format=output_format)
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+def _job_key(relpath, style_key, stat):
+    return f"{relpath}|{style_key}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+class Manifest:
+    """Append-only record of completed (file, style) jobs"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        torn = False
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    torn = not line.endswith('\n')
+                    try:
+                        self.done.add(json.loads(line)['key'])
+                    except (ValueError, KeyError):
+                        # A torn last line from an interrupted run
+                        continue
+        self._file = open(path, 'a', encoding='utf-8')
+        if torn:
+            # Start on a fresh line so the next entry isn't glued to the torn one
+            self._file.write('\n')
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def record(self, key, source, style_name, output):
+        entry = {"key": key, "source": source, "style": style_name, "output": output,
+                 "finished": time.time()}
+        self._file.write(json.dumps(entry) + '\n')
+        # Flush each entry so a crash loses at most the jobs in flight
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.done.add(key)
+
+    def close(self):
+        self._file.close()
+
+
+def collect_jobs(source_dir, output_dir, styles, manifest, params=None, seed=None, output_format='PNG'):
+    """Return (pending jobs with their keys, number of skipped jobs)
+
+    params maps style names to that style's parameters.
+    """
+    processor = AdvancedImageProcessor()
+    params = params or {}
+    # Changing parameters or the seed must not count as already done
+    style_keys = {name: f"{name}:{processor.cache_key(name, params.get(name), seed)}" for name in styles}
+    jobs = []
+    skipped = 0
+    extension = output_format.lower()
+    output_root = os.path.abspath(output_dir)
+    for root, dirs, files in os.walk(source_dir):
+        # Never pick up our own results when output lives inside the source tree
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != output_root)
+        for filename in sorted(files):
+            if not is_frame_name(filename):
+                continue
+            source_path = os.path.join(root, filename)
+            relpath = os.path.relpath(source_path, source_dir)
+            stat = os.stat(source_path)
+            for style_name in styles:
+                key = _job_key(relpath, style_keys[style_name], stat)
+                output_path = os.path.join(output_dir, style_name, f"{relpath}.{extension}")
+                if key in manifest and os.path.exists(output_path):
+                    skipped += 1
+                    continue
+                jobs.append((key, relpath, (source_path, output_path, style_name, params.get(style_name), seed, output_format)))
+    return jobs, skipped
+
+
+def run_batch(source_dir, output_dir, styles, workers=None, params=None, seed=None,
+              output_format='PNG', progress=None):
+    """Render every pending job and return a stats dict"""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = Manifest(os.path.join(output_dir, MANIFEST_NAME))
+    jobs, skipped = collect_jobs(source_dir, output_dir, styles, manifest, params, seed,
+                                 output_format)
+
+    workers = workers or os.cpu_count() or 2
+    done = 0
+    errors = []
+    start = time.perf_counter()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            pending = {}
+            queued = iter(jobs)
+            # Keep a bounded number of jobs in flight instead of submitting the whole tree
+            max_in_flight = workers * 4
+
+            def submit_more():
+                for key, relpath, job in queued:
+                    pending[executor.submit(_render, job)] = (key, relpath, job)
+                    if len(pending) >= max_in_flight:
+                        break
+
+            submit_more()
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key, relpath, job = pending.pop(future)
+                    try:
+                        output_path = future.result()
+                    except Exception as e:
+                        errors.append({"source": relpath, "style": job[2], "error": str(e)})
+                        continue
+                    manifest.record(key, relpath, job[2], os.path.relpath(output_path, output_dir))
+                    done += 1
+                    if progress:
+                        progress(done, len(jobs), time.perf_counter() - start)
+                submit_more()
+    finally:
+        manifest.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rendered": done,
+        "skipped": skipped,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "images_per_second": round(done / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    processor = AdvancedImageProcessor()
+    available = list(processor.get_available_styles().keys())
+
+    parser = argparse.ArgumentParser(description="Apply styles to every image in a directory tree")
+    parser.add_argument('source', help="directory tree of input images")
+    parser.add_argument('output', help="output directory (one sub-directory per style)")
+    parser.add_argument('--styles', default=','.join(available),
+                        help="comma-separated styles to render (default: all)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=None, help="seed for random styles (glitch)")
+    parser.add_argument('--params', type=json.loads, default={},
+                        help='per-style parameters as JSON, e.g. \'{"pop_art": {"bits": 3}}\'')
+    parser.add_argument('--strength', type=float, default=None, help="strength applied to every style")
+    parser.add_argument('--format', default='PNG', help="output image format")
+    args = parser.parse_args(argv)
+
+    styles = [s.strip() for s in args.styles.split(',') if s.strip()]
+    unknown = [s for s in styles if s not in available]
+    if unknown:
+        parser.error(f"Style(s) {unknown} not supported. Available: {available}")
+
+    if not isinstance(args.params, dict):
+        parser.error("--params must be a JSON object mapping style names to their parameters")
+    for name, style_params in args.params.items():
+        if not isinstance(style_params, dict):
+            parser.error(f"--params for style '{name}' must be a JSON object")
+
+    params = {name: dict(args.params.get(name, {})) for name in styles}
+    if args.strength is not None:
+        for style_params in params.values():
+            style_params['strength'] = args.strength
+    for name, style_params in params.items():
+        try:
+            processor.resolve_params(name, style_params)
+        except ValueError as e:
+            parser.error(str(e))
+
+    def progress(done, total, elapsed):
+        rate = done / elapsed if elapsed else 0.0
+        eta = (total - done) / rate if rate else 0.0
+        print(f"\r🎨 {done}/{total}  {rate:.1f} img/s  ETA {eta:.0f}s", end='', flush=True)
+
+    try:
+        stats = run_batch(args.source, args.output, styles, workers=args.workers,
+                          params=params, seed=args.seed, output_format=args.format.upper(),
+                          progress=progress)
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted - run the same command again to resume")
+        return 130
+
+    print()
+    print(f"✅ Rendered {stats['rendered']} (skipped {stats['skipped']} already done) "
+          f"in {stats['elapsed_seconds']}s ({stats['images_per_second']} img/s)")
+    for error in stats['errors']:
+        print(f"❌ {error['source']} [{error['style']}]: {error['error']}")
+    return 1 if stats['errors'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
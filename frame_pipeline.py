@@ -0,0 +1,417 @@
+"""Streaming stylization of frame sequences.
+
+Frames come from a directory, a zip or a tar archive and flow through
+read -> style -> encode stages. Each stage is a small pool of worker threads
+and the stages are joined by bounded queues, so memory stays flat no matter
+how long the sequence is.
+"""
+import argparse
+import json
+import os
+import queue
+import tarfile
+import threading
+import time
+import zipfile
+from io import BytesIO
+
+from PIL import Image
+
+from image_processor import AdvancedImageProcessor
+
+FRAME_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
+
+# Temporal coherence modes for styles with randomness (glitch)
+COHERENCE_MODES = ('fixed', 'per_frame', 'smooth')
+
+# Phase step per frame for the 'smooth' mode
+SMOOTH_PHASE_STEP = 0.15
+
+_DONE = object()
+
+# How often blocked queue operations check whether the pipeline is stopping
+_POLL_SECONDS = 0.1
+
+
+def _put(q, item, stop):
+    """Put item on q, giving up (returns False) once stop is set"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stop):
+    """Next item from q, or _DONE once stop is set"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def is_frame_name(name):
+    return '.' in name and name.rsplit('.', 1)[1].lower() in FRAME_EXTENSIONS
+
+
+def safe_frame_name(name):
+    """Normalized relative '/'-separated name, or None if it could escape the output
+
+    Archive member names are untrusted: absolute names, drive letters and
+    '..' components are refused.
+    """
+    name = name.replace('\\', '/')
+    if name.startswith('/') or (len(name) > 1 and name[1] == ':'):
+        return None
+    parts = [part for part in name.split('/') if part not in ('', '.')]
+    if not parts or '..' in parts:
+        return None
+    return '/'.join(parts)
+
+
+def _checked_frames(named_frames):
+    """Pass (name, data) through with safe names; unsafe ones become frame errors"""
+    for name, data in named_frames:
+        safe = safe_frame_name(name)
+        if safe is None:
+            yield name, ValueError(f"Unsafe frame name '{name}'")
+        else:
+            yield safe, data
+
+
+def iter_frame_source(source):
+    """Yield (name, raw bytes) for every frame of a directory or archive
+
+    source is a directory path, an archive path or a seekable file object
+    holding a zip or tar archive. Frames are yielded in name order. A
+    corrupt or unrecognized archive raises ValueError; a member whose name
+    would escape the output is yielded with a ValueError instead of bytes.
+    """
+    try:
+        yield from _iter_frames(source)
+    except tarfile.ReadError as e:
+        raise ValueError("Not a readable zip or tar archive of frames") from e
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Corrupt zip archive of frames: {e}") from e
+
+
+def _iter_frames(source):
+    if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+        names = []
+        for root, _, files in os.walk(source):
+            for filename in files:
+                if is_frame_name(filename):
+                    names.append(os.path.relpath(os.path.join(root, filename), source))
+        for name in sorted(names):
+            with open(os.path.join(source, name), 'rb') as f:
+                yield name.replace(os.sep, '/'), f.read()
+        return
+
+    if zipfile.is_zipfile(source):
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        with zipfile.ZipFile(source) as archive:
+            names = sorted(n for n in archive.namelist() if is_frame_name(n))
+            yield from _checked_frames((name, archive.read(name)) for name in names)
+        return
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+        archive = tarfile.open(fileobj=source, mode='r:*')
+    else:
+        archive = tarfile.open(source, mode='r:*')
+    with archive:
+        members = sorted(
+            (m for m in archive.getmembers() if m.isfile() and is_frame_name(m.name)),
+            key=lambda m: m.name
+        )
+        yield from _checked_frames((m.name, archive.extractfile(m).read()) for m in members)
+
+
+class DirectorySink:
+    """Write encoded frames into a directory"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, name, data):
+        root = os.path.realpath(self.path)
+        target = os.path.realpath(os.path.join(root, name))
+        if os.path.commonpath([root, target]) != root or target == root:
+            raise ValueError(f"Refusing to write '{name}' outside {self.path}")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+
+class ZipSink:
+    """Write encoded frames into a zip archive (path or file object)"""
+
+    def __init__(self, target):
+        # PNG data is already compressed, so store it as-is
+        self.archive = zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_STORED)
+
+    def write(self, name, data):
+        if safe_frame_name(name) != name:
+            raise ValueError(f"Refusing to store unsafe name '{name}'")
+        self.archive.writestr(name, data)
+
+    def close(self):
+        self.archive.close()
+
+
+class _Stage:
+    """A pool of worker threads moving items between two bounded queues"""
+
+    def __init__(self, name, func, inbox, outbox, workers, stop):
+        self.name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.stop = stop
+        self.workers = max(1, workers)
+        self._active = self.workers
+        self._lock = threading.Lock()
+        self.threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _run(self):
+        while True:
+            item = _get(self.inbox, self.stop)
+            if item is _DONE:
+                if self.stop.is_set():
+                    return
+                # Let the sibling workers see the sentinel too
+                _put(self.inbox, _DONE, self.stop)
+                with self._lock:
+                    self._active -= 1
+                    last = self._active == 0
+                if last:
+                    _put(self.outbox, _DONE, self.stop)
+                return
+
+            index, name, payload = item
+            # Failed frames travel through untouched so the sink can report them
+            if not isinstance(payload, Exception):
+                try:
+                    payload = self.func(index, name, payload)
+                except Exception as e:
+                    payload = e
+            if not _put(self.outbox, (index, name, payload), self.stop):
+                return
+
+
+class FramePipeline:
+    """Apply one AdvancedImageProcessor style to a whole frame sequence"""
+
+    def __init__(self, style_name, processor=None, params=None, coherence='fixed', seed=0,
+                 workers=None, queue_size=8, output_format='PNG', max_frames=None, max_pixels=None):
+        if coherence not in COHERENCE_MODES:
+            raise ValueError(f"Coherence '{coherence}' not supported. Available: {list(COHERENCE_MODES)}")
+
+        self.processor = processor or AdvancedImageProcessor()
+        if style_name not in self.processor.get_available_styles():
+            raise ValueError(f"Style '{style_name}' not supported. Available: {list(self.processor.get_available_styles().keys())}")
+
+        self.style_name = style_name
+        # Validate once up front rather than failing on every frame
+        self.params = self.processor.resolve_params(style_name, params)
+        self.coherence = coherence
+        self.seed = seed
+        self.queue_size = queue_size
+        self.output_format = output_format.upper()
+        # Optional limits on the sequence: frame count and total pixels
+        self.max_frames = max_frames
+        self.max_pixels = max_pixels
+
+        # Styling dominates, so it gets the largest pool by default
+        cpus = os.cpu_count() or 2
+        self.workers = workers or {'read': 2, 'style': cpus, 'encode': max(2, cpus // 2)}
+
+    def _frame_randomness(self, index):
+        """Seed and phase for a frame according to the coherence mode"""
+        if self.coherence == 'per_frame':
+            return self.seed + index, 0.0
+        if self.coherence == 'smooth':
+            return self.seed, index * SMOOTH_PHASE_STEP
+        return self.seed, 0.0
+
+    def _read(self, index, name, data):
+        image = Image.open(BytesIO(data))
+        # Decode here rather than lazily in the style stage
+        image.load()
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return image
+
+    def _style(self, index, name, image):
+        seed, phase = self._frame_randomness(index)
+        return self.processor.process_image(image, self.style_name, params=self.params,
+                                            seed=seed, phase=phase)
+
+    def _encode(self, index, name, image):
+        buffered = BytesIO()
+        image.save(buffered, format=self.output_format)
+        return buffered.getvalue()
+
+    def _output_name(self, name):
+        # Keep the source extension so a.png and a.jpg don't collide
+        return f"{name}.{self.output_format.lower()}"
+
+    def _check_limits(self, index, data, pixels):
+        """Running pixel total after this frame; ValueError past the limits"""
+        if self.max_frames is not None and index >= self.max_frames:
+            raise ValueError(f"Too many frames: at most {self.max_frames} allowed")
+        if self.max_pixels is None or isinstance(data, Exception):
+            return pixels
+        try:
+            # Only parses the header, the read stage does the decoding
+            width, height = Image.open(BytesIO(data)).size
+        except Exception:
+            # Unreadable frames are reported by the read stage
+            return pixels
+        pixels += width * height
+        if pixels > self.max_pixels:
+            raise ValueError(f"Frames too large: at most {self.max_pixels} pixels in total allowed")
+        return pixels
+
+    def run(self, source, sink, progress=None):
+        """Stream every frame of source through the pipeline into sink
+
+        Returns a stats dict with the frame count, elapsed time, frames per
+        second and any per-frame errors. If reading the source or the sink
+        fails, every stage is stopped before the error is raised.
+        """
+        raw_queue = queue.Queue(self.queue_size)
+        decoded_queue = queue.Queue(self.queue_size)
+        styled_queue = queue.Queue(self.queue_size)
+        encoded_queue = queue.Queue(self.queue_size)
+
+        stop = threading.Event()
+        stages = [
+            _Stage('read', self._read, raw_queue, decoded_queue, self.workers['read'], stop),
+            _Stage('style', self._style, decoded_queue, styled_queue, self.workers['style'], stop),
+            _Stage('encode', self._encode, styled_queue, encoded_queue, self.workers['encode'], stop),
+        ]
+        for stage in stages:
+            stage.start()
+
+        feed_errors = []
+
+        def feed():
+            try:
+                pixels = 0
+                for index, (name, data) in enumerate(iter_frame_source(source)):
+                    pixels = self._check_limits(index, data, pixels)
+                    if not _put(raw_queue, (index, name, data), stop):
+                        return
+            except Exception as e:
+                feed_errors.append(e)
+                # No point finishing the frames already in flight
+                stop.set()
+            finally:
+                _put(raw_queue, _DONE, stop)
+
+        start = time.perf_counter()
+        feeder = threading.Thread(target=feed, name='feed', daemon=True)
+        feeder.start()
+
+        frames = 0
+        errors = []
+        # Frames finish out of order; hold them until their turn so the
+        # sink always receives them in sequence
+        reorder = {}
+        next_index = 0
+        try:
+            while True:
+                item = _get(encoded_queue, stop)
+                if item is _DONE:
+                    break
+                reorder[item[0]] = item
+                while next_index in reorder:
+                    _, name, payload = reorder.pop(next_index)
+                    next_index += 1
+                    if isinstance(payload, Exception):
+                        errors.append({"frame": name, "error": str(payload)})
+                        continue
+                    sink.write(self._output_name(name), payload)
+                    frames += 1
+                    if progress:
+                        progress(frames, time.perf_counter() - start)
+        finally:
+            # Unblocks every stage (a no-op after a clean run) so a failing
+            # sink never leaves threads parked on full queues
+            stop.set()
+            sink.close()
+            feeder.join()
+            for stage in stages:
+                for thread in stage.threads:
+                    thread.join()
+
+        if feed_errors:
+            raise feed_errors[0]
+
+        elapsed = time.perf_counter() - start
+        return {
+            "frames": frames,
+            "errors": errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+
+def open_sink(output):
+    """Pick a sink from the output path: *.zip -> archive, otherwise directory"""
+    if output.lower().endswith('.zip'):
+        return ZipSink(output)
+    return DirectorySink(output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stylize a frame sequence (directory, zip or tar)")
+    parser.add_argument('source', help="directory of frames or a zip/tar archive")
+    parser.add_argument('output', help="output directory, or a path ending in .zip")
+    parser.add_argument('--style', default='oil_painting', help="style to apply")
+    parser.add_argument('--coherence', choices=COHERENCE_MODES, default='fixed',
+                        help="how randomness varies between frames")
+    parser.add_argument('--seed', type=int, default=0, help="base seed for random styles")
+    parser.add_argument('--params', type=json.loads, default=None,
+                        help='style parameters as JSON, e.g. \'{"strength": 0.5}\'')
+    parser.add_argument('--style-workers', type=int, default=None)
+    parser.add_argument('--encode-workers', type=int, default=None)
+    parser.add_argument('--queue-size', type=int, default=8, help="bound of each inter-stage queue")
+    args = parser.parse_args(argv)
+
+    pipeline = FramePipeline(args.style, params=args.params, coherence=args.coherence, seed=args.seed,
+                             queue_size=args.queue_size)
+    if args.style_workers:
+        pipeline.workers['style'] = args.style_workers
+    if args.encode_workers:
+        pipeline.workers['encode'] = args.encode_workers
+
+    def progress(frames, elapsed):
+        print(f"\r🎞️  {frames} frames  {frames / elapsed:.1f} fps", end='', flush=True)
+
+    stats = pipeline.run(args.source, open_sink(args.output), progress=progress)
+    print()
+    print(f"✅ {stats['frames']} frames in {stats['elapsed_seconds']}s ({stats['fps']} fps)")
+    for error in stats['errors']:
+        print(f"❌ {error['frame']}: {error['error']}")
+    return 1 if stats['errors'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
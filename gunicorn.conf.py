@@ -0,0 +1,43 @@
+"""Gunicorn settings for production serving, configured from the environment.
+
+    WEB_CONCURRENCY           worker processes (default: one per CPU)
+    GUNICORN_THREADS          threads per worker (default: 4)
+    GUNICORN_TIMEOUT          seconds before a silent worker is restarted (default: 120)
+    GUNICORN_GRACEFUL_TIMEOUT seconds to finish requests on restart (default: 30)
+    GUNICORN_KEEPALIVE        keep-alive seconds (default: 5)
+    GUNICORN_MAX_REQUESTS     recycle workers after this many requests, 0 = never (default: 0)
+    GUNICORN_BIND             listen address (default: 0.0.0.0:$PORT, PORT defaulting to 5000)
+    GUNICORN_LOG_LEVEL        log level (default: info)
+    TILE_WORKERS              procedural tile threads per worker (default: 1)
+
+The image work is CPU-bound, so the defaults keep roughly one busy thread
+per CPU: more workers than cores only adds contention and memory.
+"""
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+workers = _env_int('WEB_CONCURRENCY', multiprocessing.cpu_count())
+threads = _env_int('GUNICORN_THREADS', 4)
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = _env_int('GUNICORN_TIMEOUT', 120)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 0)
+max_requests_jitter = max_requests // 10
+
+# The workers already cover every CPU, so each renders its tiles serially
+os.environ.setdefault('TILE_WORKERS', '1')
+
+# Import wsgi.py (and warm up) in the master before forking workers
+preload_app = True
+
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+accesslog = '-'
+errorlog = '-'
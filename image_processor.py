@@ -1,7 +1,78 @@
 import numpy as np
 from PIL import Image, ImageFilter, ImageEnhance, ImageOps
+import hashlib
+import json
 import random
 
+# Global parameter accepted by every style: 0 keeps the original, 1 is the full effect
+STRENGTH_PARAM = {
+    'type': 'float', 'default': 1.0, 'min': 0.0, 'max': 1.0,
+    'description': 'Blend between the original (0) and the full effect (1)'
+}
+
+# Longest style chain one request may run
+MAX_CHAIN_STEPS = 8
+
+# Sepia tone matrix (rows produce R, G, B)
+SEPIA_MATRIX = np.array([
+    [0.393, 0.769, 0.189],
+    [0.349, 0.686, 0.168],
+    [0.272, 0.534, 0.131]
+])
+
+class PixelBuffer:
+    """RGB pixels in one contiguous uint8 buffer, shared by NumPy and PIL
+
+    The buffer is laid out as RGBX (4 bytes per pixel, the layout PIL uses
+    internally for RGB) so Image.frombuffer can map it without copying.
+    .array is an (H, W, 3) NumPy view and .image a PIL view of the same
+    memory. Buffers filled from a PIL image are read-only; call copy() to
+    get a private writable one.
+    """
+    
+    def __init__(self, data):
+        self.data = data
+        self.size = (data.shape[1], data.shape[0])
+        self._image = None
+    
+    @classmethod
+    def from_image(cls, image):
+        """Wrap a PIL image's pixels (one copy, read-only result)"""
+        if image.mode not in ('RGB', 'RGBX'):
+            image = image.convert('RGB')
+        data = np.frombuffer(image.tobytes('raw', 'RGBX'), dtype=np.uint8)
+        return cls(data.reshape(image.height, image.width, 4))
+    
+    @classmethod
+    def from_array(cls, array):
+        """Copy an (H, W, 3) uint8 array into a new writable buffer"""
+        height, width = array.shape[:2]
+        data = np.empty((height, width, 4), dtype=np.uint8)
+        data[:, :, :3] = array
+        data[:, :, 3] = 255
+        return cls(data)
+    
+    @property
+    def array(self):
+        return self.data[:, :, :3]
+    
+    @property
+    def image(self):
+        if self._image is None:
+            self._image = Image.frombuffer('RGBX', self.size, self.data, 'raw', 'RGBX', 0, 1)
+        return self._image
+    
+    @property
+    def writable(self):
+        return self.data.flags.writeable
+    
+    def copy(self):
+        return PixelBuffer(self.data.copy())
+    
+    def to_image(self):
+        """Standalone RGB PIL image, e.g. for encoding (one copy)"""
+        return self.image.convert('RGB')
+
 class AdvancedImageProcessor:
     def __init__(self):
         self.available_styles = {
@@ -14,76 +85,253 @@ class AdvancedImageProcessor:
             'pixel_art': 'Pixel Art Effect',
             'cartoon': 'Cartoon Effect'
         }
+        
+        # Tunable parameters per style; defaults reproduce the original look
+        self.style_params = {
+            'oil_painting': {
+                'color': {'type': 'float', 'default': 1.3, 'min': 0.0, 'max': 3.0, 'description': 'Color boost'},
+                'contrast': {'type': 'float', 'default': 1.2, 'min': 0.0, 'max': 3.0, 'description': 'Contrast boost'}
+            },
+            'watercolor': {
+                'blur_radius': {'type': 'float', 'default': 2.0, 'min': 0.0, 'max': 20.0, 'description': 'Softness of the wash'},
+                'edge_weight': {'type': 'float', 'default': 0.1, 'min': 0.0, 'max': 1.0, 'description': 'How much outline shows through'},
+                'color': {'type': 'float', 'default': 1.4, 'min': 0.0, 'max': 3.0, 'description': 'Color boost'}
+            },
+            'sketch': {
+                'blur_radius': {'type': 'float', 'default': 3.0, 'min': 0.0, 'max': 20.0, 'description': 'Pencil stroke softness'},
+                'contrast': {'type': 'float', 'default': 2.0, 'min': 0.0, 'max': 5.0, 'description': 'Contrast boost'}
+            },
+            'pop_art': {
+                'bits': {'type': 'int', 'default': 4, 'min': 1, 'max': 8, 'description': 'Bits kept per channel when posterizing'},
+                'color': {'type': 'float', 'default': 2.0, 'min': 0.0, 'max': 4.0, 'description': 'Saturation boost'},
+                'contrast': {'type': 'float', 'default': 1.5, 'min': 0.0, 'max': 3.0, 'description': 'Contrast boost'}
+            },
+            'vintage': {
+                'vignette': {'type': 'float', 'default': 0.7, 'min': 0.0, 'max': 1.0, 'description': 'Darkening of the edges'},
+                'color': {'type': 'float', 'default': 0.8, 'min': 0.0, 'max': 2.0, 'description': 'Saturation'}
+            },
+            'glitch': {
+                'max_shift': {'type': 'int', 'default': 15, 'min': 0, 'max': 200, 'description': 'Largest channel shift in pixels'},
+                'noise': {'type': 'int', 'default': 30, 'min': 1, 'max': 255, 'description': 'Noise amplitude'}
+            },
+            'pixel_art': {
+                'block_size': {'type': 'int', 'default': 8, 'min': 1, 'max': 128, 'description': 'Size of each pixel block'},
+                'color': {'type': 'float', 'default': 1.5, 'min': 0.0, 'max': 3.0, 'description': 'Color boost'}
+            },
+            'cartoon': {
+                'colors': {'type': 'int', 'default': 8, 'min': 2, 'max': 256, 'description': 'Palette size'},
+                'color': {'type': 'float', 'default': 1.3, 'min': 0.0, 'max': 3.0, 'description': 'Color boost'}
+            }
+        }
+        
+        # How each effect wants its pixels: 'takes' is 'image' (PIL) or
+        # 'array' (RGB uint8 NumPy view), and 'inplace' effects modify that
+        # array and return it. Anything not listed takes a PIL image. Chains
+        # keep pixels in a PixelBuffer so switching between the two is free.
+        self.effect_specs = {
+            'vintage': {'takes': 'array', 'inplace': False},
+            'glitch': {'takes': 'array', 'inplace': True}
+        }
+    
+    def get_available_styles(self, include_params=False):
+        """Return list of available artistic styles
+
+        With include_params each style maps to its description and the schema
+        of the parameters it accepts (including the global strength).
+        """
+        if not include_params:
+            return self.available_styles
+        return {
+            name: {
+                'description': description,
+                'params': {**self.style_params.get(name, {}), 'strength': STRENGTH_PARAM}
+            }
+            for name, description in self.available_styles.items()
+        }
+    
+    def resolve_params(self, style_name, params=None):
+        """Validate params against the style schema and fill in defaults"""
+        schema = {**self.style_params.get(style_name, {}), 'strength': STRENGTH_PARAM}
+        params = params or {}
+        if not isinstance(params, dict):
+            raise ValueError(f"Parameters for style '{style_name}' must be an object")
+        
+        unknown = set(params) - set(schema)
+        if unknown:
+            raise ValueError(f"Unknown parameter(s) {sorted(unknown)} for style '{style_name}'. Available: {list(schema.keys())}")
+        
+        resolved = {}
+        for name, spec in schema.items():
+            value = params.get(name, spec['default'])
+            try:
+                value = float(value)
+                # Don't quietly truncate 2.7 to 2
+                if spec['type'] == 'int':
+                    if not value.is_integer():
+                        raise ValueError
+                    value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Parameter '{name}' must be a {spec['type']}")
+            if not spec['min'] <= value <= spec['max']:
+                raise ValueError(f"Parameter '{name}' must be between {spec['min']} and {spec['max']}")
+            resolved[name] = value
+        return resolved
+    
+    def cache_key(self, style_name, params=None, seed=None):
+        """Stable key for a style result: style, resolved parameters and seed"""
+        payload = json.dumps({
+            'style': style_name,
+            'params': self.resolve_params(style_name, params),
+            'seed': seed
+        }, sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+    
+    def resolve_chain(self, steps):
+        """Validate a chain of steps and return [(style_name, params), ...]
+
+        Each step is a style name, a (style_name, params) pair or a
+        {"style": ..., "params": ...} dict.
+        """
+        if not steps:
+            raise ValueError("At least one style is required")
+        if len(steps) > MAX_CHAIN_STEPS:
+            raise ValueError(f"At most {MAX_CHAIN_STEPS} styles can be chained, got {len(steps)}")
+        
+        resolved = []
+        for step in steps:
+            if isinstance(step, str):
+                style_name, params = step, None
+            elif isinstance(step, dict):
+                style_name, params = step.get('style'), step.get('params')
+            elif isinstance(step, (list, tuple)) and len(step) == 2:
+                style_name, params = step
+            else:
+                raise ValueError(f"Invalid style step {step!r}: use a name, [name, params] or {{\"style\": ..., \"params\": ...}}")
+            
+            if not isinstance(style_name, str) or style_name not in self.available_styles:
+                raise ValueError(f"Style '{style_name}' not supported. Available: {list(self.available_styles.keys())}")
+            resolved.append((style_name, self.resolve_params(style_name, params)))
+        return resolved
     
-    def get_available_styles(self):
-        """Return list of available artistic styles"""
-        return self.available_styles
+    def process_image(self, image, style_name, params=None, seed=None, phase=0.0):
+        """Main method to apply artistic style to image
+
+        params are validated against the style schema (see
+        get_available_styles). seed and phase only affect styles with
+        randomness (glitch) and let callers such as the frame pipeline keep
+        consecutive frames coherent.
+        """
+        return self.process_chain(image, [(style_name, params)], seed=seed, phase=phase)
     
-    def process_image(self, image, style_name):
-        """Main method to apply artistic style to image"""
-        if style_name not in self.available_styles:
-            raise ValueError(f"Style '{style_name}' not supported. Available: {list(self.available_styles.keys())}")
+    def process_chain(self, image, steps, seed=None, phase=0.0):
+        """Apply several styles in order to one in-memory image
+
+        The whole chain is validated before any work is done. Between steps
+        the pixels are either a PIL image or a PixelBuffer, so handing an
+        array result to a PIL effect costs no copy.
+        """
+        steps = self.resolve_chain(steps)
         
         # Convert to RGB if necessary
         if image.mode != 'RGB':
             image = image.convert('RGB')
         
-        # Apply the selected style
+        pixels = image
+        for style_name, params in steps:
+            pixels = self._apply_step(pixels, style_name, dict(params), seed, phase)
+        
+        # Never hand the caller's own image back as the result
+        if pixels is image:
+            return image.copy()
+        if isinstance(pixels, PixelBuffer):
+            return pixels.to_image()
+        if pixels.mode != 'RGB':
+            return pixels.convert('RGB')
+        return pixels
+    
+    def _apply_step(self, pixels, style_name, params, seed, phase):
+        """Run one effect on a PIL image or PixelBuffer, blending by strength"""
+        strength = params.pop('strength')
+        
+        # Nothing to do at zero strength
+        if strength == 0:
+            return pixels
+        
+        spec = self.effect_specs.get(style_name, {'takes': 'image', 'inplace': False})
+        if spec['takes'] == 'array':
+            source = self._to_buffer(pixels)
+            target = source
+            # In-place effects need a private buffer when the input must survive
+            if spec['inplace'] and (strength < 1 or not source.writable):
+                target = source.copy()
+            styled = self._run_effect(style_name, target.array, params, seed, phase)
+            if spec['inplace']:
+                styled = target
+        else:
+            source = self._to_image(pixels)
+            styled = self._run_effect(style_name, source, params, seed, phase)
+        
+        if strength < 1:
+            styled = self._blend_strength(self._to_image(pixels), self._to_image(styled), strength)
+        return styled
+    
+    def _run_effect(self, style_name, source, params, seed, phase):
+        """Dispatch to the effect method for style_name"""
         if style_name == 'oil_painting':
-            return self.oil_painting_effect(image)
+            return self.oil_painting_effect(source, **params)
         elif style_name == 'watercolor':
-            return self.watercolor_effect(image)
+            return self.watercolor_effect(source, **params)
         elif style_name == 'sketch':
-            return self.sketch_effect(image)
+            return self.sketch_effect(source, **params)
         elif style_name == 'pop_art':
-            return self.pop_art_effect(image)
+            return self.pop_art_effect(source, **params)
         elif style_name == 'vintage':
-            return self.vintage_effect(image)
+            return self.vintage_effect(source, **params)
         elif style_name == 'glitch':
-            return self.glitch_effect(image)
+            return self.glitch_effect(source, seed=seed, phase=phase, **params)
         elif style_name == 'pixel_art':
-            return self.pixel_art_effect(image)
+            return self.pixel_art_effect(source, **params)
         elif style_name == 'cartoon':
-            return self.cartoon_effect(image)
+            return self.cartoon_effect(source, **params)
         else:
-            return image
+            return source
     
-    def oil_painting_effect(self, image):
+    def oil_painting_effect(self, image, color=1.3, contrast=1.2):
         """Apply oil painting effect"""
         # Apply median filter for painting look
         painted = image.filter(ImageFilter.MedianFilter(size=3))
         
         # Enhance colors and contrast
         color_enhancer = ImageEnhance.Color(painted)
-        painted = color_enhancer.enhance(1.3)
+        painted = color_enhancer.enhance(color)
         
         contrast_enhancer = ImageEnhance.Contrast(painted)
-        painted = contrast_enhancer.enhance(1.2)
+        painted = contrast_enhancer.enhance(contrast)
         
         # Add smooth texture
         painted = painted.filter(ImageFilter.SMOOTH_MORE)
         
         return painted
     
-    def watercolor_effect(self, image):
+    def watercolor_effect(self, image, blur_radius=2, edge_weight=0.1, color=1.4):
         """Create watercolor painting effect"""
         # Apply blur for soft look
-        blurred = image.filter(ImageFilter.GaussianBlur(2))
+        blurred = image.filter(ImageFilter.GaussianBlur(blur_radius))
         
         # Enhance edges slightly
         edges = image.filter(ImageFilter.FIND_EDGES)
         edges = edges.filter(ImageFilter.GaussianBlur(1))
         
         # Blend images
-        result = Image.blend(blurred, edges, 0.1)
+        result = Image.blend(blurred, edges, edge_weight)
         
         # Boost colors
         color_enhancer = ImageEnhance.Color(result)
-        result = color_enhancer.enhance(1.4)
+        result = color_enhancer.enhance(color)
         
         return result
     
-    def sketch_effect(self, image):
+    def sketch_effect(self, image, blur_radius=3, contrast=2.0):
         """Convert image to pencil sketch"""
         # Convert to grayscale
         grayscale = image.convert('L')
@@ -92,75 +340,95 @@ class AdvancedImageProcessor:
         inverted = ImageOps.invert(grayscale)
         
         # Apply Gaussian blur
-        blurred = inverted.filter(ImageFilter.GaussianBlur(radius=3))
+        blurred = inverted.filter(ImageFilter.GaussianBlur(radius=blur_radius))
         
         # Blend with original
         result = Image.blend(grayscale, blurred, 0.5)
         
         # Enhance contrast
         contrast_enhancer = ImageEnhance.Contrast(result)
-        result = contrast_enhancer.enhance(2.0)
+        result = contrast_enhancer.enhance(contrast)
         
         # Convert back to RGB
         return result.convert('RGB')
     
-    def pop_art_effect(self, image):
+    def pop_art_effect(self, image, bits=4, color=2.0, contrast=1.5):
         """Apply vibrant pop art effect"""
+        # Posterize needs true RGB (PixelBuffer views are RGBX)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        
         # Reduce color palette
-        pop_art = ImageOps.posterize(image, 4)
+        pop_art = ImageOps.posterize(image, bits)
         
         # Boost saturation
         color_enhancer = ImageEnhance.Color(pop_art)
-        pop_art = color_enhancer.enhance(2.0)
+        pop_art = color_enhancer.enhance(color)
         
         # Increase contrast
         contrast_enhancer = ImageEnhance.Contrast(pop_art)
-        pop_art = contrast_enhancer.enhance(1.5)
+        pop_art = contrast_enhancer.enhance(contrast)
         
         return pop_art
     
-    def vintage_effect(self, image):
-        """Apply vintage/retro photo effect"""
-        # Apply sepia tone
-        vintage = self._apply_sepia_tone(image)
+    def vintage_effect(self, image, vignette=0.7, color=0.8):
+        """Apply vintage/retro photo effect (accepts a PIL image or RGB array)"""
+        # Apply sepia tone into a fresh buffer
+        vintage = self._apply_sepia_tone(self._to_array(image))
         
-        # Add vignette
-        vintage = self._add_vignette(vintage, intensity=0.7)
+        # Add vignette in place
+        self._add_vignette(vintage.array, intensity=vignette)
         
-        # Reduce saturation
-        color_enhancer = ImageEnhance.Color(vintage)
-        vintage = color_enhancer.enhance(0.8)
+        # Reduce saturation (PIL reads the buffer without a copy)
+        color_enhancer = ImageEnhance.Color(vintage.image)
+        result = color_enhancer.enhance(color)
         
-        return vintage
+        if isinstance(image, np.ndarray):
+            return result
+        return result.convert('RGB')
     
-    def glitch_effect(self, image):
-        """Create digital glitch art effect"""
+    def glitch_effect(self, image, seed=None, phase=0.0, max_shift=15, noise=30):
+        """Create digital glitch art effect
+
+        With a seed the result is reproducible; phase then sways the channel
+        shifts smoothly so a sequence of frames drifts instead of jumping.
+        Given an RGB array it works in place and returns that array,
+        otherwise it returns a new PIL image.
+        """
         # Convert to numpy array
-        img_array = np.array(image)
+        img_array = self._to_array(image)
         height, width = img_array.shape[:2]
         
-        # Create glitched version
-        glitched = img_array.copy()
+        # Pick the random source (seeded for reproducible frames)
+        if seed is None:
+            rng, np_rng = random, np.random
+        else:
+            rng, np_rng = random.Random(seed), np.random.RandomState(seed)
+        drift = int(round(4 * np.sin(phase))) if phase else 0
+        
+        glitched = img_array
         
         # Shift red channel
-        shift_x = random.randint(5, 15)
+        shift_x = rng.randint(max_shift // 3, max_shift) + drift
         glitched[:, :, 0] = np.roll(glitched[:, :, 0], shift_x, axis=1)
         
         # Shift blue channel
-        shift_x = random.randint(-15, -5)
+        shift_x = rng.randint(-max_shift, -(max_shift // 3)) - drift
         glitched[:, :, 2] = np.roll(glitched[:, :, 2], shift_x, axis=1)
         
         # Add noise
-        noise = np.random.randint(0, 30, (height, width))
+        noise_field = np_rng.randint(0, noise, (height, width))
         for i in range(3):
-            glitched[:, :, i] = np.clip(glitched[:, :, i] + noise, 0, 255)
+            glitched[:, :, i] = np.clip(glitched[:, :, i] + noise_field, 0, 255)
         
-        return Image.fromarray(glitched.astype(np.uint8))
+        if isinstance(image, np.ndarray):
+            return glitched
+        return Image.fromarray(glitched)
     
-    def pixel_art_effect(self, image):
+    def pixel_art_effect(self, image, block_size=8, color=1.5):
         """Convert image to pixel art style"""
         # Reduce resolution
-        small_size = (image.width // 8, image.height // 8)
+        small_size = (max(1, image.width // block_size), max(1, image.height // block_size))
         pixel_art = image.resize(small_size, Image.NEAREST)
         
         # Scale back up
@@ -168,14 +436,18 @@ class AdvancedImageProcessor:
         
         # Enhance colors
         color_enhancer = ImageEnhance.Color(pixel_art)
-        pixel_art = color_enhancer.enhance(1.5)
+        pixel_art = color_enhancer.enhance(color)
         
         return pixel_art
     
-    def cartoon_effect(self, image):
+    def cartoon_effect(self, image, colors=8, color=1.3):
         """Apply cartoon effect"""
+        # Palette quantization needs true RGB (PixelBuffer views are RGBX)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        
         # Reduce colors
-        cartoon = image.convert('P', palette=Image.ADAPTIVE, colors=8)
+        cartoon = image.convert('P', palette=Image.ADAPTIVE, colors=colors)
         cartoon = cartoon.convert('RGB')
         
         # Smooth the image
@@ -183,58 +455,68 @@ class AdvancedImageProcessor:
         
         # Boost saturation
         color_enhancer = ImageEnhance.Color(cartoon)
-        cartoon = color_enhancer.enhance(1.3)
+        cartoon = color_enhancer.enhance(color)
         
         return cartoon
     
     # Helper methods
     
-    def _apply_sepia_tone(self, image):
-        """Apply sepia tone effect"""
-        width, height = image.size
-        sepia = image.copy()
-        
-        for y in range(height):
-            for x in range(width):
-                r, g, b = image.getpixel((x, y))
-                
-                # Sepia formula
-                tr = int(0.393 * r + 0.769 * g + 0.189 * b)
-                tg = int(0.349 * r + 0.686 * g + 0.168 * b)
-                tb = int(0.272 * r + 0.534 * g + 0.131 * b)
-                
-                sepia.putpixel((x, y), (
-                    min(255, tr),
-                    min(255, tg), 
-                    min(255, tb)
-                ))
-        
-        return sepia
-    
-    def _add_vignette(self, image, intensity=0.7):
-        """Add vignette (darkened edges) effect"""
-        width, height = image.size
-        vignette = image.copy()
-        
-        for y in range(height):
-            for x in range(width):
-                # Calculate distance from center
-                dx = (x - width/2) / (width/2)
-                dy = (y - height/2) / (height/2)
-                distance = (dx**2 + dy**2) ** 0.5
-                
-                # Apply vignette
-                vignette_factor = 1 - (distance * intensity)
-                vignette_factor = max(0, min(1, vignette_factor))
-                
-                r, g, b = image.getpixel((x, y))
-                vignette.putpixel((x, y), (
-                    int(r * vignette_factor),
-                    int(g * vignette_factor),
-                    int(b * vignette_factor)
-                ))
-        
-        return vignette
+    def _to_array(self, pixels):
+        """Writable RGB uint8 array for a PIL image (arrays pass through untouched)"""
+        if isinstance(pixels, np.ndarray):
+            return pixels
+        if pixels.mode != 'RGB':
+            pixels = pixels.convert('RGB')
+        return np.array(pixels)
+    
+    def _to_buffer(self, pixels):
+        """PixelBuffer for a PIL image or array (buffers pass through untouched)"""
+        if isinstance(pixels, PixelBuffer):
+            return pixels
+        if isinstance(pixels, np.ndarray):
+            return PixelBuffer.from_array(pixels)
+        return PixelBuffer.from_image(pixels)
+    
+    def _to_image(self, pixels):
+        """PIL image for a PixelBuffer, mapped without copying"""
+        if isinstance(pixels, PixelBuffer):
+            return pixels.image
+        return pixels
+    
+    def _blend_strength(self, base, styled, strength):
+        """Mix styled back towards base (both PIL images) with Image.blend"""
+        # RGB and RGBX hold the same pixels but blend needs matching modes
+        if base.mode != styled.mode:
+            if base.mode != 'RGB':
+                base = base.convert('RGB')
+            if styled.mode != 'RGB':
+                styled = styled.convert('RGB')
+        return Image.blend(base, styled, strength)
+    
+    def _apply_sepia_tone(self, pixels):
+        """Apply sepia tone effect to an RGB array, returning a new PixelBuffer"""
+        # Sepia formula for every pixel at once
+        toned = pixels @ SEPIA_MATRIX.T
+        np.minimum(toned, 255, out=toned)
+        
+        # Storing into the uint8 buffer truncates like int()
+        return PixelBuffer.from_array(toned)
+    
+    def _add_vignette(self, pixels, intensity=0.7):
+        """Add vignette (darkened edges) effect to an RGB array, in place"""
+        height, width = pixels.shape[:2]
+        
+        # Calculate distance from center
+        dx = (np.arange(width) - width/2) / (width/2)
+        dy = (np.arange(height) - height/2) / (height/2)
+        distance = np.sqrt(dx[np.newaxis, :]**2 + dy[:, np.newaxis]**2)
+        
+        # Apply vignette
+        vignette_factor = np.clip(1 - (distance * intensity), 0, 1)
+        
+        np.multiply(pixels, vignette_factor[:, :, np.newaxis], out=pixels, casting='unsafe')
+        
+        return pixels
 
 # Test the processor
 if __name__ == '__main__':
@@ -0,0 +1,471 @@
+"""Load-testing harness for the web API.
+
+Starts the server locally (Flask dev server, gunicorn or the ASGI app), or
+targets one that is already running. It then replays a weighted mix of
+/api/apply-style and /api/generate-from-text requests from concurrent
+clients. Uploads are synthetic images generated up front, so the clients
+spend no CPU on them while the test runs.
+
+    python loadtest.py run --server gunicorn --concurrency 16 --duration 60 --save runs/today.json
+    python loadtest.py compare runs/last-release.json runs/today.json
+
+Each run reports throughput, latency percentiles, error rate and the
+server's resident memory (RSS) over time. --save writes all of it as JSON
+so capacity can be compared across releases.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from io import BytesIO
+from urllib.parse import urlsplit
+
+import numpy as np
+from PIL import Image
+
+RUN_FORMAT_VERSION = 1
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Default traffic mix: mostly uploads of varied sizes and styles, some text-to-art
+DEFAULT_MIX = [
+    {"weight": 4, "kind": "apply-style", "style": "oil_painting", "size": [512, 512]},
+    {"weight": 3, "kind": "apply-style", "style": "sketch", "size": [256, 256]},
+    {"weight": 2, "kind": "apply-style", "style": "glitch", "size": [1024, 768]},
+    {"weight": 2, "kind": "apply-style", "style": "pixel_art", "size": [800, 600]},
+    {"weight": 1, "kind": "apply-style", "style": "vintage", "size": [512, 512]},
+    {"weight": 1, "kind": "apply-style", "styles": "pixel_art,glitch", "size": [512, 512]},
+    {"weight": 2, "kind": "generate", "style": "abstract", "size": [512, 512]},
+    {"weight": 2, "kind": "generate", "style": "nebula", "size": [512, 512]}
+]
+
+SERVER_COMMANDS = {
+    'flask': [sys.executable, '-c',
+              'import sys; from app import app, warm_up; warm_up(); '
+              'app.run(host="127.0.0.1", port=int(sys.argv[1]), threaded=True)', '{port}'],
+    'gunicorn': ['gunicorn', '-c', 'gunicorn.conf.py', '--bind', '127.0.0.1:{port}', 'wsgi:application'],
+    'asgi': ['uvicorn', 'asgi_app:app', '--host', '127.0.0.1', '--port', '{port}', '--log-level', 'warning']
+}
+
+
+# Workload
+
+def _synthetic_png(width, height, rng):
+    """A photo-like stand-in upload: smooth gradients plus grain"""
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([
+        128 + 100 * np.sin(x / (width / rng.uniform(2, 6)) + rng.uniform(0, 6)),
+        128 + 100 * np.cos(y / (height / rng.uniform(2, 6)) + rng.uniform(0, 6)),
+        128 + 100 * np.sin((x + y) / (width / rng.uniform(2, 6)))
+    ], axis=2)
+    base += rng.normal(0, 12, base.shape)
+    buffered = BytesIO()
+    Image.fromarray(np.clip(base, 0, 255).astype(np.uint8)).save(buffered, format='PNG')
+    return buffered.getvalue()
+
+
+def _multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    body = BytesIO()
+    for name, value in fields.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, data) in files.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+                   f'filename="{filename}"\r\nContent-Type: image/png\r\n\r\n'.encode())
+        body.write(data)
+        body.write(b'\r\n')
+    body.write(f'--{boundary}--\r\n'.encode())
+    return body.getvalue(), f'multipart/form-data; boundary={boundary}'
+
+
+def _label(entry):
+    width, height = entry['size']
+    style = entry.get('styles') or entry.get('style')
+    return f"{entry['kind']}:{style}@{width}x{height}"
+
+
+def build_requests(mix, variants=3, seed=0):
+    """Pre-build request bodies for every mix entry: [(label, weight, [(path, body, content type)])]"""
+    rng = np.random.RandomState(seed)
+    prepared = []
+    for entry in mix:
+        width, height = entry['size']
+        bodies = []
+        for i in range(variants):
+            if entry['kind'] == 'apply-style':
+                fields = {'styles': entry['styles']} if 'styles' in entry else {'style_name': entry['style']}
+                fields.update({k: json.dumps(v) if isinstance(v, dict) else v
+                               for k, v in entry.get('fields', {}).items()})
+                body, content_type = _multipart(fields, {'image': ('upload.png', _synthetic_png(width, height, rng))})
+                bodies.append(('/api/apply-style', body, content_type))
+            elif entry['kind'] == 'generate':
+                payload = {'prompt': f"load test prompt {i}", 'style': entry['style'],
+                           'width': width, 'height': height}
+                bodies.append(('/api/generate-from-text', json.dumps(payload).encode(), 'application/json'))
+            else:
+                raise ValueError(f"Unknown request kind '{entry['kind']}'. Use 'apply-style' or 'generate'")
+        prepared.append((_label(entry), entry.get('weight', 1), bodies))
+    return prepared
+
+
+# Server process and memory
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, port, env_overrides=None):
+    command = [part.format(port=port) for part in SERVER_COMMANDS[mode]]
+    env = dict(os.environ, **(env_overrides or {}))
+    return subprocess.Popen(command, cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(base_url, process=None, timeout=60):
+    """Poll the server's readiness probe until it answers 200"""
+    parts = urlsplit(base_url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode} before becoming ready")
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            conn.request('GET', '/readyz')
+            status = conn.getresponse().status
+            conn.close()
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} not ready after {timeout}s")
+
+
+def process_tree_rss(pid):
+    """Resident memory in bytes of pid and all its descendants (Linux /proc), or None"""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            return sum(p.memory_info().rss for p in [root] + root.children(recursive=True))
+        except psutil.Error:
+            return None
+
+    if not os.path.isdir('/proc'):
+        return None
+    children = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # The parent pid is the 2nd field after the parenthesised command
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    total = 0
+    stack = [pid]
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f'/proc/{current}/statm') as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+        stack.extend(children.get(current, []))
+    return total or None
+
+
+# Running
+
+def _percentile(values, q):
+    return float(np.percentile(values, q)) if values else None
+
+
+def _summarize(records, elapsed):
+    latencies = [r['latency'] for r in records if r['ok']]
+    errors = sum(1 for r in records if not r['ok'])
+    return {
+        "requests": len(records),
+        "errors": errors,
+        "error_rate": round(errors / len(records), 4) if records else 0.0,
+        "throughput_rps": round(len(records) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            name: round(value * 1000, 1) if value is not None else None
+            for name, value in (('p50', _percentile(latencies, 50)), ('p90', _percentile(latencies, 90)),
+                                ('p95', _percentile(latencies, 95)), ('p99', _percentile(latencies, 99)),
+                                ('max', max(latencies) if latencies else None))
+        }
+    }
+
+
+def run_load(base_url, prepared, concurrency, duration, server_pid=None, sample_interval=1.0,
+             progress=None):
+    """Drive closed-loop load for duration seconds and return the run results"""
+    parts = urlsplit(base_url)
+    labels = [label for label, _, _ in prepared]
+    weights = [weight for _, weight, _ in prepared]
+    bodies = {label: variants for label, _, variants in prepared}
+
+    records = []
+    records_lock = threading.Lock()
+    rss_samples = []
+    stop = threading.Event()
+    start = time.perf_counter()
+
+    def client(index):
+        rng = random.Random(index)
+        while not stop.is_set():
+            label = rng.choices(labels, weights)[0]
+            path, body, content_type = rng.choice(bodies[label])
+            began = time.perf_counter()
+            status, error = None, None
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=120)
+            try:
+                conn.request('POST', path, body=body, headers={'Content-Type': content_type})
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as e:
+                # e.g. a dropped connection (IncompleteRead, RemoteDisconnected)
+                error = str(e) or type(e).__name__
+            finally:
+                conn.close()
+            finished = time.perf_counter()
+            with records_lock:
+                records.append({
+                    "label": label, "t": finished - start, "latency": finished - began,
+                    "status": status, "ok": status == 200, "error": error
+                })
+
+    def sample_rss():
+        while not stop.is_set():
+            rss = process_tree_rss(server_pid)
+            if rss is not None:
+                rss_samples.append({"t": round(time.perf_counter() - start, 2), "rss_mb": round(rss / 2**20, 1)})
+            stop.wait(sample_interval)
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    if server_pid:
+        threads.append(threading.Thread(target=sample_rss, daemon=True))
+    for thread in threads:
+        thread.start()
+
+    while time.perf_counter() - start < duration:
+        time.sleep(min(1.0, duration))
+        if progress:
+            with records_lock:
+                progress(len(records), time.perf_counter() - start)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # Per-second timeline of completions
+    timeline = []
+    for second in range(int(elapsed) + 1):
+        bucket = [r for r in records if second <= r['t'] < second + 1]
+        ok = [r['latency'] for r in bucket if r['ok']]
+        timeline.append({
+            "t": second,
+            "requests": len(bucket),
+            "errors": len(bucket) - len(ok),
+            "p95_ms": round(_percentile(ok, 95) * 1000, 1) if ok else None
+        })
+
+    rss_values = [s['rss_mb'] for s in rss_samples]
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "summary": _summarize(records, elapsed),
+        "by_label": {label: _summarize([r for r in records if r['label'] == label], elapsed)
+                     for label in labels},
+        "rss_mb": {
+            "start": rss_values[0] if rss_values else None,
+            "max": max(rss_values) if rss_values else None,
+            "end": rss_values[-1] if rss_values else None,
+            "samples": rss_samples
+        },
+        "timeline": timeline,
+        "error_samples": [r['error'] or f"HTTP {r['status']}" for r in records if not r['ok']][:20]
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result):
+    summary = result['summary']
+    latency = summary['latency_ms']
+    print(f"Requests: {summary['requests']}  errors: {summary['errors']} ({summary['error_rate']:.2%})  "
+          f"throughput: {summary['throughput_rps']} req/s")
+    print(f"Latency ms  p50 {latency['p50']}  p90 {latency['p90']}  p95 {latency['p95']}  "
+          f"p99 {latency['p99']}  max {latency['max']}")
+    if result['rss_mb']['max'] is not None:
+        rss = result['rss_mb']
+        print(f"Server RSS MB  start {rss['start']}  max {rss['max']}  end {rss['end']}")
+    print()
+    print(f"{'label':<42} {'req':>6} {'err':>5} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for label, stats in result['by_label'].items():
+        latency = stats['latency_ms']
+        print(f"{label:<42} {stats['requests']:>6} {stats['errors']:>5} {stats['throughput_rps']:>7} "
+              f"{latency['p50'] or '-':>8} {latency['p95'] or '-':>8} {latency['p99'] or '-':>8}")
+    for error in result['error_samples'][:5]:
+        print(f"❌ {error}")
+
+
+def compare_runs(paths):
+    """Print headline metrics of saved runs side by side, with change versus the first"""
+    runs = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            runs.append(json.load(f))
+
+    def metrics(run):
+        summary = run['result']['summary']
+        return {
+            'throughput_rps': summary['throughput_rps'],
+            'error_rate': summary['error_rate'],
+            'p50_ms': summary['latency_ms']['p50'],
+            'p95_ms': summary['latency_ms']['p95'],
+            'p99_ms': summary['latency_ms']['p99'],
+            'rss_max_mb': run['result']['rss_mb']['max']
+        }
+
+    baseline = metrics(runs[0])
+    header = f"{'metric':<16}" + ''.join(f"{os.path.basename(p)[:22]:>24}" for p in paths)
+    print(header)
+    for name in baseline:
+        row = f"{name:<16}"
+        for run in runs:
+            value = metrics(run)[name]
+            cell = '-' if value is None else f"{value}"
+            if run is not runs[0] and value is not None and baseline[name]:
+                cell += f" ({(value - baseline[name]) / baseline[name]:+.0%})"
+            row += f"{cell:>24}"
+        print(row)
+    for path, run in zip(paths, runs):
+        meta = run['meta']
+        print(f"{os.path.basename(path)}: {meta['server']} commit {meta['commit']} "
+              f"c={meta['concurrency']} {meta['duration']}s {meta['started']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the AI Art Generator API")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="run a load test")
+    run.add_argument('--server', choices=sorted(SERVER_COMMANDS) + ['none'], default='gunicorn',
+                     help="server to start locally ('none' with --url to target a running one)")
+    run.add_argument('--url', default=None, help="base URL of an already running server")
+    run.add_argument('--pid', type=int, default=None, help="pid of that server, for RSS sampling")
+    run.add_argument('--concurrency', type=int, default=8, help="concurrent clients")
+    run.add_argument('--duration', type=float, default=30, help="seconds of load")
+    run.add_argument('--mix', default=None, help="JSON file with the request mix (see DEFAULT_MIX)")
+    run.add_argument('--env', action='append', default=[], metavar='NAME=VALUE',
+                     help="environment for the started server, e.g. WEB_CONCURRENCY=4")
+    run.add_argument('--save', default=None, help="write the run as JSON to this path")
+
+    compare = commands.add_parser('compare', help="compare saved runs")
+    compare.add_argument('runs', nargs='+', help="saved run files; the first is the baseline")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        compare_runs(args.runs)
+        return 0
+
+    server_env = {}
+    for item in args.env:
+        name, sep, value = item.partition('=')
+        if not sep or not name:
+            parser.error(f"--env expects NAME=VALUE, got {item!r}")
+        server_env[name] = value
+
+    mix = DEFAULT_MIX
+    if args.mix:
+        with open(args.mix, encoding='utf-8') as f:
+            mix = json.load(f)
+    print("⏳ Building request bodies...")
+    prepared = build_requests(mix)
+
+    process = None
+    server_pid = args.pid
+    if args.server == 'none' or args.url:
+        if not args.url:
+            parser.error("--server none needs --url")
+        base_url = args.url.rstrip('/')
+    else:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        print(f"🚀 Starting {args.server} on {base_url}")
+        process = start_server(args.server, port, server_env)
+        server_pid = process.pid
+
+    try:
+        wait_until_ready(base_url, process)
+        print(f"🔥 {args.concurrency} clients for {args.duration}s")
+
+        def progress(done, elapsed):
+            print(f"\r   {done} requests  {done / elapsed:.1f} req/s", end='', flush=True)
+
+        started = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        result = run_load(base_url, prepared, args.concurrency, args.duration, server_pid, progress=progress)
+        print()
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    print_report(result)
+
+    if args.save:
+        run_record = {
+            "format": RUN_FORMAT_VERSION,
+            "meta": {
+                "started": started,
+                "commit": _git_commit(),
+                "server": args.server if process is not None else base_url,
+                "server_env": server_env,
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "mix": mix,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count()
+            },
+            "result": result
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(run_record, f, indent=2)
+        print(f"💾 Saved run to {args.save}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
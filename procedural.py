@@ -0,0 +1,256 @@
+"""Deterministic procedural art engine for text prompts.
+
+A prompt is hashed into a seed, and the seed picks noise permutation tables
+and a colour palette, so the same prompt always renders the same picture.
+Images are built from vectorized noise fields (Perlin gradient noise and
+fractal Brownian motion) evaluated in world coordinates, one square tile at
+a time. Tiles render in parallel and are cached by
+(seed, style, zoom, tile x, tile y): a larger canvas of the same prompt
+only renders the tiles it has not seen yet, and a repeated zoom level is
+free. TILE_WORKERS sets the tile thread pool size (default: CPU count) and
+TILE_CACHE_MB the cache budget (default: one largest canvas plus 25%).
+"""
+import colorsys
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+GENERATOR_STYLES = {
+    'clouds': 'Soft fBm cloudscape',
+    'marble': 'Veined marble from turbulent stripes',
+    'terrain': 'Contour-banded terrain map',
+    'plasma': 'Flowing plasma interference',
+    'nebula': 'Domain-warped nebula'
+}
+
+# Pixels per noise period at zoom 0; each zoom level doubles it
+BASE_PERIOD = 256.0
+
+MAX_CANVAS = 4096
+
+# Default tile cache budget: one MAX_CANVAS render plus a quarter, so
+# repeating the largest canvas is served from the cache instead of
+# thrashing the LRU (about 60 MB of RGB tiles)
+DEFAULT_CACHE_BYTES = MAX_CANVAS * MAX_CANVAS * 3 * 5 // 4
+
+# Zoom range: -8 puts one noise period on each pixel, 12 zooms 4096x in
+MIN_ZOOM = -8
+MAX_ZOOM = 12
+
+# Unit gradient directions for Perlin noise
+_GRADIENTS = np.array([
+    [1, 0], [-1, 0], [0, 1], [0, -1],
+    [0.7071, 0.7071], [-0.7071, 0.7071], [0.7071, -0.7071], [-0.7071, -0.7071]
+])
+
+
+def prompt_seed(prompt):
+    """Stable 64-bit seed for a prompt (unlike hash(), the same across runs)"""
+    return int.from_bytes(hashlib.sha256(prompt.encode('utf-8')).digest()[:8], 'big')
+
+
+def palette_from_seed(seed, stops=5):
+    """A 256-entry RGB lookup table whose colours are derived from the seed"""
+    rng = np.random.RandomState(seed % 2**32)
+    base_hue = rng.random_sample()
+    # Analogous, complementary or triadic hue spread
+    spread = [0.08, 0.5, 1 / 3][rng.randint(3)]
+
+    colours = []
+    for i in range(stops):
+        hue = (base_hue + spread * i / (stops - 1) * 2) % 1.0
+        saturation = 0.45 + 0.5 * rng.random_sample()
+        # Dark to light so the noise value reads as brightness too
+        value = 0.15 + 0.85 * i / (stops - 1)
+        colours.append(colorsys.hsv_to_rgb(hue, saturation, value))
+    colours = np.array(colours) * 255
+
+    positions = np.linspace(0, 1, stops)
+    ramp = np.linspace(0, 1, 256)
+    lut = np.stack([np.interp(ramp, positions, colours[:, c]) for c in range(3)], axis=1)
+    return lut.astype(np.uint8)
+
+
+def _fade(t):
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def perlin(x, y, perm):
+    """2D Perlin gradient noise for coordinate arrays, roughly in [-1, 1]"""
+    xi = np.floor(x).astype(np.int64)
+    yi = np.floor(y).astype(np.int64)
+    xf = x - xi
+    yf = y - yi
+    xi &= 255
+    yi &= 255
+
+    def gradient_dot(ix, iy, dx, dy):
+        g = _GRADIENTS[perm[perm[ix] + iy] & 7]
+        return g[..., 0] * dx + g[..., 1] * dy
+
+    n00 = gradient_dot(xi, yi, xf, yf)
+    n10 = gradient_dot(xi + 1, yi, xf - 1, yf)
+    n01 = gradient_dot(xi, yi + 1, xf, yf - 1)
+    n11 = gradient_dot(xi + 1, yi + 1, xf - 1, yf - 1)
+
+    u = _fade(xf)
+    v = _fade(yf)
+    nx0 = n00 + u * (n10 - n00)
+    nx1 = n01 + u * (n11 - n01)
+    return (nx0 + v * (nx1 - nx0)) * 1.4142
+
+
+def fbm(x, y, perm, octaves=5, lacunarity=2.0, gain=0.5):
+    """Fractal Brownian motion: octaves of Perlin noise, normalized to about [-1, 1]"""
+    total = np.zeros_like(x)
+    amplitude = 1.0
+    frequency = 1.0
+    norm = 0.0
+    for octave in range(octaves):
+        # Offset each octave so their lattices don't line up
+        total += amplitude * perlin(x * frequency + 17.3 * octave, y * frequency + 31.7 * octave, perm)
+        norm += amplitude
+        amplitude *= gain
+        frequency *= lacunarity
+    return total / norm
+
+
+def _field(style, u, v, perm):
+    """Scalar field in [0, 1] for a style at world coordinates u, v"""
+    if style == 'clouds':
+        t = 0.5 + 0.7 * fbm(u, v, perm, octaves=6)
+    elif style == 'marble':
+        t = 0.5 + 0.5 * np.sin((u * 4 + 3 * fbm(u, v, perm, octaves=5)) * np.pi)
+    elif style == 'terrain':
+        height = 0.5 + 0.6 * fbm(u * 0.7, v * 0.7, perm, octaves=6)
+        t = np.floor(np.clip(height, 0, 1) * 7) / 6
+    elif style == 'plasma':
+        t = (np.sin(u * 5) + np.sin(v * 7) + np.sin((u + v) * 3) + 2 * perlin(u * 2, v * 2, perm) + 5) / 10
+    elif style == 'nebula':
+        q = fbm(u, v, perm, octaves=4)
+        r = fbm(u + 4 * q, v + 4 * q + 5.2, perm, octaves=5)
+        t = 0.5 + 0.8 * r * (0.6 + 0.4 * np.abs(q))
+    else:
+        raise ValueError(f"Generator style '{style}' not supported. Available: {list(GENERATOR_STYLES.keys())}")
+    return np.clip(t, 0, 1)
+
+
+class TileCache:
+    """Thread-safe LRU cache of rendered tiles"""
+
+    def __init__(self, max_tiles):
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is None:
+                self.misses += 1
+                return None
+            self._tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+
+    def put(self, key, tile):
+        with self._lock:
+            self._tiles[key] = tile
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+
+    def info(self):
+        with self._lock:
+            return {"tiles": len(self._tiles), "max_tiles": self.max_tiles,
+                    "hits": self.hits, "misses": self.misses}
+
+
+class ProceduralGenerator:
+    """Tile-based renderer for the GENERATOR_STYLES"""
+
+    def __init__(self, tile_size=128, cache_bytes=None, workers=None):
+        self.tile_size = tile_size
+        cache_bytes = cache_bytes or int(os.environ.get('TILE_CACHE_MB', 0)) * 2**20 or DEFAULT_CACHE_BYTES
+        self.cache = TileCache(max(1, cache_bytes // (tile_size * tile_size * 3)))
+        self.workers = workers or int(os.environ.get('TILE_WORKERS', 0)) or os.cpu_count() or 2
+        self._executor = None
+        self._executor_pid = None
+        self._seed_tables = {}
+
+    def _pool(self):
+        # Threads don't survive fork, so a preforked worker builds its own pool
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='tiles')
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _tables(self, seed):
+        """Permutation table and palette for a seed (cheap, but reused per tile)"""
+        tables = self._seed_tables.get(seed)
+        if tables is None:
+            perm = np.random.RandomState(seed % 2**32).permutation(256)
+            tables = (np.concatenate([perm, perm]), palette_from_seed(seed))
+            if len(self._seed_tables) > 256:
+                self._seed_tables.clear()
+            self._seed_tables[seed] = tables
+        return tables
+
+    def render_tile(self, seed, style, zoom, tx, ty):
+        """RGB uint8 array for one tile, from the cache when possible"""
+        key = (seed, style, zoom, tx, ty)
+        tile = self.cache.get(key)
+        if tile is not None:
+            return tile
+
+        perm, palette = self._tables(seed)
+        size = self.tile_size
+        period = BASE_PERIOD * 2.0 ** zoom
+
+        # Sample pixel centres in world coordinates so neighbouring tiles line up
+        xs = (tx * size + np.arange(size) + 0.5) / period
+        ys = (ty * size + np.arange(size) + 0.5) / period
+        u, v = np.meshgrid(xs, ys)
+
+        field = _field(style, u, v, perm)
+        tile = palette[(field * 255).astype(np.uint8)]
+        tile.setflags(write=False)
+
+        self.cache.put(key, tile)
+        return tile
+
+    def render(self, prompt, style, width, height, zoom=0):
+        """Render a width x height PIL image of prompt in a generator style"""
+        if not isinstance(prompt, str):
+            raise ValueError("Prompt must be a string")
+        if style not in GENERATOR_STYLES:
+            raise ValueError(f"Generator style '{style}' not supported. Available: {list(GENERATOR_STYLES.keys())}")
+        width, height, zoom = int(width), int(height), int(zoom)
+        if not (0 < width <= MAX_CANVAS and 0 < height <= MAX_CANVAS):
+            raise ValueError(f"Width and height must be between 1 and {MAX_CANVAS}")
+        if not MIN_ZOOM <= zoom <= MAX_ZOOM:
+            raise ValueError(f"Zoom must be between {MIN_ZOOM} and {MAX_ZOOM}")
+
+        seed = prompt_seed(prompt)
+        size = self.tile_size
+        coords = [(tx, ty) for ty in range(-(-height // size)) for tx in range(-(-width // size))]
+
+        tiles = self._pool().map(lambda c: self.render_tile(seed, style, zoom, c[0], c[1]), coords)
+
+        canvas = np.empty((height, width, 3), dtype=np.uint8)
+        for (tx, ty), tile in zip(coords, tiles):
+            x0, y0 = tx * size, ty * size
+            x1, y1 = min(x0 + size, width), min(y0 + size, height)
+            canvas[y0:y1, x0:x1] = tile[:y1 - y0, :x1 - x0]
+        return Image.fromarray(canvas)
+
+
+# Shared engine used by the web apps
+generator = ProceduralGenerator()
@@ -0,0 +1,272 @@
+"""Per-request profiling of the image work behind the API.
+
+Profiling is opt-in per request with ?profile=1 (cProfile) or
+?profile=sample (stack sampling), and only for callers presenting the
+admin token in the X-Admin-Token header. A fraction of ordinary traffic
+can also be profiled automatically. Configuration comes from the
+environment:
+
+    PROFILE_ADMIN_TOKEN      token required for ?profile and the listing endpoints
+                             (unset = on-demand profiling disabled)
+    PROFILE_SAMPLE_RATE      fraction of requests profiled automatically (default 0)
+    PROFILE_MODE             mode for sampled requests: cprofile or sample (default cprofile)
+    PROFILE_SAMPLE_INTERVAL  stack sampling interval in milliseconds (default 2)
+    PROFILE_DIR              where profiles are stored (default results/profiles)
+    PROFILE_KEEP             number of profiles kept on disk (default 200)
+
+Each profile is saved as <id>.pstats (cProfile only, for pstats/snakeviz),
+<id>.collapsed (folded stacks for flamegraph.pl/speedscope) and <id>.json
+with metadata.
+"""
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+PROFILE_FORMATS = ('pstats', 'collapsed')
+PROFILE_MODES = ('cprofile', 'sample')
+
+
+def _env_number(name, default, cast, low, high=float('inf')):
+    """Numeric setting from the environment, rejected at import if invalid"""
+    raw = os.environ.get(name, '').strip()
+    if not raw:
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, not {raw!r}") from None
+    if not low <= value <= high:
+        bounds = f"at least {low}" if high == float('inf') else f"between {low} and {high}"
+        raise ValueError(f"{name} must be {bounds}, not {raw!r}")
+    return value
+
+
+# Read once so a misconfigured server fails at startup, not on every request
+SAMPLE_RATE = _env_number('PROFILE_SAMPLE_RATE', 0.0, float, 0.0, 1.0)
+SAMPLE_INTERVAL = _env_number('PROFILE_SAMPLE_INTERVAL', 2.0, float, 0.1) / 1000
+KEEP = _env_number('PROFILE_KEEP', 200, int, 1)
+SAMPLED_MODE = os.environ.get('PROFILE_MODE', 'cprofile')
+if SAMPLED_MODE not in PROFILE_MODES:
+    raise ValueError(f"PROFILE_MODE must be one of {PROFILE_MODES}, not {SAMPLED_MODE!r}")
+
+# Timestamp first, so ids sort oldest to newest
+_PROFILE_ID = re.compile(r'^[0-9]{8}_[0-9]{6}_[0-9]{6}_[0-9a-f]{4}$')
+
+# Only one cProfile can be active per process on newer Pythons; requests
+# that find it busy fall back to stack sampling
+_cprofile_lock = threading.Lock()
+
+
+class ProfilingForbidden(Exception):
+    """?profile was requested without a valid admin token"""
+
+
+def profile_dir():
+    return os.environ.get('PROFILE_DIR') or os.path.join('results', 'profiles')
+
+
+def is_admin(token):
+    expected = os.environ.get('PROFILE_ADMIN_TOKEN', '')
+    return bool(expected) and token is not None and hmac.compare_digest(token, expected)
+
+
+class ProfileRequest:
+    """What to profile for one request (plain data, so it can cross into a process pool)"""
+
+    def __init__(self, mode, label, requested, result=None):
+        self.mode = mode
+        self.label = label
+        self.requested = requested
+        self.result = result
+        self.profile_id = f"{datetime.now():%Y%m%d_%H%M%S_%f}_{uuid.uuid4().hex[:4]}"
+
+
+def profile_request_for(profile_arg, admin_token, label, result=None):
+    """ProfileRequest if this request should be profiled, else None
+
+    Raises ProfilingForbidden when ?profile is given without a valid admin token.
+    """
+    if profile_arg not in (None, '', '0'):
+        if not is_admin(admin_token):
+            raise ProfilingForbidden("Profiling requires a valid X-Admin-Token")
+        return ProfileRequest('sample' if profile_arg == 'sample' else 'cprofile', label, True, result)
+
+    if SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE:
+        return ProfileRequest(SAMPLED_MODE, label, False, result)
+    return None
+
+
+class _StackSampler:
+    """Samples one thread's Python stack on a timer into folded-stack counts"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def _function_name(func):
+    filename, _, name = func
+    return f"{os.path.basename(filename)}:{name}" if filename != '~' else name
+
+
+def _collapse_pstats(stats, max_depth=64):
+    """Approximate folded stacks (microseconds) from cProfile's caller graph
+
+    cProfile only records caller -> callee edges, so each function's time
+    is split between its call paths in proportion to the edge times.
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+    roots = [func for func, (_, _, _, _, callers) in stats.items()
+             if not any(caller in stats for caller in callers)]
+
+    counts = Counter()
+
+    def walk(func, path, share):
+        _, _, self_time, total_time, _ = stats[func]
+        stack = path + [_function_name(func)]
+        fraction = share / total_time if total_time else 0
+        if self_time * fraction > 0:
+            counts[';'.join(stack)] += self_time * fraction
+        if len(stack) >= max_depth:
+            return
+        for callee in callees.get(func, []):
+            # Skip recursion back into a frame already on this path
+            if _function_name(callee) in stack:
+                continue
+            edge_time = stats[callee][4][func][3]
+            if edge_time * fraction > 0:
+                walk(callee, stack, edge_time * fraction)
+
+    for root in roots:
+        walk(root, [], stats[root][3])
+    return Counter({stack: int(seconds * 1e6) for stack, seconds in counts.items() if seconds >= 1e-6})
+
+
+def _prune(directory, keep):
+    metas = sorted((name for name in os.listdir(directory) if name.endswith('.json')), reverse=True)
+    for name in metas[keep:]:
+        profile_id = name[:-len('.json')]
+        for ext in ('json',) + PROFILE_FORMATS:
+            try:
+                os.remove(os.path.join(directory, f"{profile_id}.{ext}"))
+            except FileNotFoundError:
+                pass
+
+
+def profiled_call(profile_request, func, *args):
+    """Run func(*args), profiling it when profile_request is set
+
+    Returns (result, profile metadata or None). The profile files are
+    written before returning.
+    """
+    if profile_request is None:
+        return func(*args), None
+
+    mode = profile_request.mode
+    if mode == 'cprofile' and not _cprofile_lock.acquire(blocking=False):
+        mode = 'sample'
+
+    started = time.perf_counter()
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        try:
+            result = profiler.runcall(func, *args)
+        finally:
+            _cprofile_lock.release()
+        stats = pstats.Stats(profiler)
+    else:
+        sampler = _StackSampler(threading.get_ident(), SAMPLE_INTERVAL)
+        sampler.start()
+        try:
+            result = func(*args)
+        finally:
+            sampler.stop()
+    elapsed = time.perf_counter() - started
+
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, profile_request.profile_id)
+
+    files = ['collapsed']
+    if mode == 'cprofile':
+        stats.dump_stats(f"{base}.pstats")
+        files.insert(0, 'pstats')
+        collapsed = _collapse_pstats(stats.stats)
+    else:
+        collapsed = sampler.counts
+    with open(f"{base}.collapsed", 'w', encoding='utf-8') as f:
+        for stack, count in collapsed.most_common():
+            f.write(f"{stack} {count}\n")
+
+    meta = {
+        "id": profile_request.profile_id,
+        "label": profile_request.label,
+        "result": profile_request.result,
+        "mode": mode,
+        "requested": profile_request.requested,
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "formats": files
+    }
+    with open(f"{base}.json", 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+    _prune(directory, KEEP)
+    return result, meta
+
+
+def list_profiles(limit=50):
+    """Metadata of the most recent profiles, newest first"""
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted((n for n in os.listdir(directory) if n.endswith('.json')), reverse=True)[:limit]:
+        try:
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_path(profile_id, fmt):
+    """Absolute path of a stored profile file, or None if it doesn't exist"""
+    if not _PROFILE_ID.match(profile_id) or fmt not in PROFILE_FORMATS:
+        return None
+    path = os.path.abspath(os.path.join(profile_dir(), f"{profile_id}.{fmt}"))
+    return path if os.path.exists(path) else None
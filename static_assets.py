@@ -0,0 +1,99 @@
+"""In-memory static assets with precompressed variants and strong ETags.
+
+Each asset is compressed once at startup (gzip always, brotli when the
+optional brotli package is installed) so serving it is a dictionary lookup.
+respond() is framework-neutral - it takes the request's Accept-Encoding and
+If-None-Match headers and returns (status, headers, body) - so both the
+Flask app and the async app can use it.
+"""
+import gzip
+import hashlib
+import json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _accepted_encodings(accept_encoding):
+    """Content codings the client accepts (q=0 means refused)"""
+    accepted = set()
+    for item in (accept_encoding or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # Weak comparison is what If-None-Match calls for
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return any((tag[2:] if tag.startswith('W/') else tag) == etag for tag in candidates)
+
+
+class StaticAsset:
+    """A response body kept in memory with gzip/brotli variants and an ETag"""
+
+    def __init__(self, body, content_type, cache_control='no-cache'):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.content_type = content_type
+        self.cache_control = cache_control
+
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # Every encoding is a different representation, so each gets its own strong ETag
+        self.variants = {None: (body, f'"{digest}"')}
+        self.variants['gzip'] = (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gz"')
+        if brotli is not None:
+            self.variants['br'] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+
+    @classmethod
+    def from_file(cls, path, content_type, cache_control='no-cache'):
+        with open(path, 'rb') as f:
+            return cls(f.read(), content_type, cache_control)
+
+    @classmethod
+    def from_json(cls, data, cache_control='no-cache'):
+        return cls(json.dumps(data, sort_keys=True), 'application/json', cache_control)
+
+    def choose_encoding(self, accept_encoding):
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and (encoding in accepted or '*' in accepted):
+                return encoding
+        return None
+
+    def respond(self, accept_encoding=None, if_none_match=None):
+        """Return (status, headers, body) for a GET of this asset"""
+        encoding = self.choose_encoding(accept_encoding)
+        body, etag = self.variants[encoding]
+
+        headers = {
+            'ETag': etag,
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding'
+        }
+        if _etag_matches(if_none_match, etag):
+            return 304, headers, b''
+
+        headers['Content-Type'] = self.content_type
+        headers['Content-Length'] = str(len(body))
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return 200, headers, body
@@ -0,0 +1,63 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from batch_process import MANIFEST_NAME, main, run_batch
+
+
+def sample_image(width=16, height=16, seed=0):
+    rng = np.random.RandomState(seed)
+    return Image.fromarray(rng.randint(0, 256, (height, width, 3), dtype=np.uint8))
+
+
+def make_tree(root, names):
+    for name in names:
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        sample_image(16, 16, seed=len(name)).save(path)
+
+
+def test_batch_skips_finished_jobs_and_resumes(tmp_path):
+    source = tmp_path / 'src'
+    output = tmp_path / 'out'
+    make_tree(str(source), ['a.png', 'a.jpg', 'nested/b.png'])
+
+    first = run_batch(str(source), str(output), ['sketch'], workers=1)
+    assert (first['rendered'], first['skipped'], first['errors']) == (3, 0, [])
+    assert sorted(os.listdir(output / 'sketch')) == ['a.jpg.png', 'a.png.png', 'nested']
+
+    again = run_batch(str(source), str(output), ['sketch'], workers=1)
+    assert (again['rendered'], again['skipped']) == (0, 3)
+
+    # A lost output and a torn manifest line (interrupted run) are redone
+    os.remove(output / 'sketch' / 'a.png.png')
+    with open(output / MANIFEST_NAME, 'a', encoding='utf-8') as f:
+        f.write('{"key": "trunc')
+    resumed = run_batch(str(source), str(output), ['sketch'], workers=1)
+    assert (resumed['rendered'], resumed['skipped']) == (1, 2)
+    assert (output / 'sketch' / 'a.png.png').exists()
+
+    # New parameters are new work
+    changed = run_batch(str(source), str(output), ['sketch'], workers=1,
+                        params={'sketch': {'contrast': 3.0}})
+    assert (changed['rendered'], changed['skipped']) == (3, 0)
+
+    # Entries after the torn line are still readable
+    with open(output / MANIFEST_NAME, encoding='utf-8') as f:
+        lines = [line for line in f if line.strip()]
+    assert lines[3] == '{"key": "trunc\n'
+    entries = [json.loads(line) for line in lines[:3] + lines[4:]]
+    assert len(entries) == 7
+    assert len({entry['key'] for entry in entries}) == 6
+
+
+@pytest.mark.parametrize('params', ['[1]', '{"sketch": 5}', '{"sketch": {"contrast": "high"}}'])
+def test_bad_params_are_usage_errors(tmp_path, capsys, params):
+    make_tree(str(tmp_path / 'src'), ['a.png'])
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(tmp_path / 'src'), str(tmp_path / 'out'), '--styles', 'sketch', '--params', params])
+    assert exit_info.value.code == 2
+    assert 'error:' in capsys.readouterr().err
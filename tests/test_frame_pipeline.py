@@ -0,0 +1,138 @@
+import io
+import os
+import threading
+import zipfile
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from frame_pipeline import SMOOTH_PHASE_STEP, DirectorySink, FramePipeline, ZipSink, safe_frame_name
+
+
+def png_bytes(width=24, height=16, seed=0):
+    rng = np.random.RandomState(seed)
+    buffered = io.BytesIO()
+    Image.fromarray(rng.randint(0, 256, (height, width, 3), dtype=np.uint8)).save(buffered, 'PNG')
+    return buffered.getvalue()
+
+
+def zip_of(frames):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        for name, data in frames:
+            zf.writestr(name, data)
+    archive.seek(0)
+    return archive
+
+
+class ListSink:
+    def __init__(self):
+        self.frames = []
+
+    def write(self, name, data):
+        self.frames.append((name, data))
+
+    def close(self):
+        pass
+
+
+def test_frames_reach_the_sink_in_order():
+    # Big early frames finish last unless the pipeline reorders them
+    frames = [(f"f{i:02d}.png", png_bytes(400 if i < 3 else 8, 300 if i < 3 else 8, seed=i))
+              for i in range(12)]
+    sink = ListSink()
+    stats = FramePipeline('oil_painting', workers={'read': 2, 'style': 4, 'encode': 2}).run(zip_of(frames), sink)
+
+    assert stats['frames'] == 12 and stats['errors'] == []
+    assert [name for name, _ in sink.frames] == [f"f{i:02d}.png.png" for i in range(12)]
+
+
+def test_same_stem_frames_keep_separate_outputs():
+    sink = ListSink()
+    FramePipeline('sketch').run(zip_of([('a.png', png_bytes()), ('a.jpg', png_bytes(seed=1))]), sink)
+    assert [name for name, _ in sink.frames] == ['a.jpg.png', 'a.png.png']
+
+
+def styled_frames(coherence, count=4):
+    sink = ListSink()
+    frames = [(f"f{i}.png", png_bytes(64, 32)) for i in range(count)]
+    FramePipeline('glitch', coherence=coherence, seed=9).run(zip_of(frames), sink)
+    return [data for _, data in sink.frames]
+
+
+def test_fixed_coherence_repeats_the_same_glitch():
+    assert len(set(styled_frames('fixed'))) == 1
+
+
+def test_per_frame_coherence_reseeds_every_frame():
+    assert len(set(styled_frames('per_frame'))) == 4
+
+
+def test_smooth_coherence_keeps_the_seed_and_advances_the_phase():
+    pipeline = FramePipeline('glitch', coherence='smooth', seed=9)
+    assert [pipeline._frame_randomness(i) for i in range(3)] == [
+        (9, 0.0), (9, SMOOTH_PHASE_STEP), (9, 2 * SMOOTH_PHASE_STEP)]
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('f1.png', 'f1.png'),
+    ('./clips//f1.png', 'clips/f1.png'),
+    ('clips\\f1.png', 'clips/f1.png'),
+    ('../escaped.png', None),
+    ('clips/../../escaped.png', None),
+    ('/etc/escaped.png', None),
+    ('C:/escaped.png', None),
+])
+def test_safe_frame_name(name, expected):
+    assert safe_frame_name(name) == expected
+
+
+def test_traversing_member_names_become_frame_errors(tmp_path):
+    out = tmp_path / 'work' / 'out'
+    source = zip_of([('../../escaped.png', png_bytes()), ('/abs.png', png_bytes()), ('ok.png', png_bytes())])
+    stats = FramePipeline('sketch').run(source, DirectorySink(str(out)))
+
+    assert stats['frames'] == 1
+    assert sorted(error['frame'] for error in stats['errors']) == ['../../escaped.png', '/abs.png']
+    written = [os.path.relpath(os.path.join(root, f), tmp_path) for root, _, files in os.walk(tmp_path)
+               for f in files]
+    assert written == [os.path.join('work', 'out', 'ok.png.png')]
+
+
+def test_sinks_refuse_names_outside_their_root(tmp_path):
+    with pytest.raises(ValueError):
+        DirectorySink(str(tmp_path / 'out')).write('../escaped.png', b'x')
+    with pytest.raises(ValueError):
+        ZipSink(io.BytesIO()).write('../escaped.png', b'x')
+
+
+class FailingSink(ListSink):
+    def write(self, name, data):
+        raise OSError("disk full")
+
+
+def test_failing_sink_stops_every_stage():
+    frames = [(f"f{i:02d}.png", png_bytes(seed=i)) for i in range(40)]
+    pipeline = FramePipeline('sketch', queue_size=2, workers={'read': 2, 'style': 2, 'encode': 2})
+    before = threading.active_count()
+
+    with pytest.raises(OSError):
+        pipeline.run(zip_of(frames), FailingSink())
+    assert threading.active_count() == before
+
+
+@pytest.mark.parametrize('limits', [{'max_frames': 3}, {'max_pixels': 3 * 24 * 16}])
+def test_sequence_limits_stop_the_run(limits):
+    frames = [(f"f{i:02d}.png", png_bytes(seed=i)) for i in range(10)]
+    before = threading.active_count()
+
+    with pytest.raises(ValueError):
+        FramePipeline('sketch', **limits).run(zip_of(frames), ListSink())
+    assert threading.active_count() == before
+
+
+def test_sequence_within_limits_runs():
+    frames = [(f"f{i:02d}.png", png_bytes(seed=i)) for i in range(3)]
+    stats = FramePipeline('sketch', max_frames=3, max_pixels=3 * 24 * 16).run(zip_of(frames), ListSink())
+    assert stats['frames'] == 3
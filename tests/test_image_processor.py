@@ -0,0 +1,117 @@
+import random
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from baseline_processor import AdvancedImageProcessor as BaselineProcessor
+from image_processor import MAX_CHAIN_STEPS, AdvancedImageProcessor, PixelBuffer
+
+STYLES = list(AdvancedImageProcessor().get_available_styles())
+
+
+def sample_image(width=48, height=32, seed=7):
+    rng = np.random.RandomState(seed)
+    return Image.fromarray(rng.randint(0, 256, (height, width, 3), dtype=np.uint8))
+
+
+def seeded(func, *args):
+    """Call func with the global random sources in a fixed state (for glitch)"""
+    random.seed(1234)
+    np.random.seed(1234)
+    return func(*args)
+
+
+@pytest.fixture
+def processor():
+    return AdvancedImageProcessor()
+
+
+@pytest.mark.parametrize('style_name', STYLES)
+def test_default_output_matches_baseline(processor, style_name):
+    image = sample_image()
+    expected = seeded(BaselineProcessor().process_image, image.copy(), style_name)
+    actual = seeded(processor.process_image, image.copy(), style_name)
+
+    assert actual.mode == 'RGB'
+    assert actual.size == image.size
+    assert np.array_equal(np.asarray(actual), np.asarray(expected.convert('RGB')))
+
+
+def test_seeded_output_is_reproducible(processor):
+    image = sample_image()
+    first = processor.process_image(image, 'glitch', seed=5)
+    second = processor.process_image(image, 'glitch', seed=5)
+    assert np.array_equal(np.asarray(first), np.asarray(second))
+
+
+def test_pixel_buffer_views_share_memory():
+    array = np.asarray(sample_image())
+    buffer = PixelBuffer.from_array(array)
+
+    assert buffer.writable
+    assert np.shares_memory(buffer.array, buffer.data)
+    image = buffer.image
+    buffer.array[0, 0] = (1, 2, 3)
+    buffer.array[5, 7] = (250, 251, 252)
+    assert image.getpixel((0, 0))[:3] == (1, 2, 3)
+    assert image.getpixel((7, 5))[:3] == (250, 251, 252)
+    assert np.array_equal(np.asarray(buffer.to_image()), buffer.array)
+
+
+def test_pixel_buffer_from_image_is_read_only_until_copied():
+    buffer = PixelBuffer.from_image(sample_image())
+    assert not buffer.writable
+
+    private = buffer.copy()
+    assert private.writable
+    assert not np.shares_memory(private.data, buffer.data)
+
+
+def test_strength_blends_with_original(processor):
+    image = sample_image()
+    full = processor.process_image(image, 'pop_art')
+
+    assert np.array_equal(np.asarray(processor.process_image(image, 'pop_art', {'strength': 0})),
+                          np.asarray(image))
+    half = processor.process_image(image, 'pop_art', {'strength': 0.5})
+    assert np.array_equal(np.asarray(half), np.asarray(Image.blend(image, full, 0.5)))
+
+
+def test_partial_strength_leaves_the_input_untouched(processor):
+    image = sample_image()
+    before = np.asarray(image).copy()
+    styled = processor.process_chain(image, [('glitch', {'strength': 0.5}), ('vintage', {'strength': 0.3})],
+                                     seed=3)
+    assert np.array_equal(np.asarray(image), before)
+    assert styled.mode == 'RGB'
+
+
+@pytest.mark.parametrize('steps', [
+    [],
+    ['no_such_style'],
+    [1],
+    [['glitch', {}, 'extra']],
+    [{'style': ['glitch']}],
+    [{'style': 'glitch', 'params': 5}],
+    [('glitch', {'max_shift': 2.7})],
+    [('glitch', {'max_shift': 999})],
+    [('glitch', {'unknown': 1})],
+    [('sketch', {'strength': 'high'})],
+    ['pixel_art'] * (MAX_CHAIN_STEPS + 1),
+])
+def test_invalid_chains_raise_value_error(processor, steps):
+    with pytest.raises(ValueError):
+        processor.resolve_chain(steps)
+
+
+def test_chain_forms_resolve_alike(processor):
+    resolved = processor.resolve_chain(['sketch', ('glitch', {'noise': 10}),
+                                        {'style': 'pixel_art', 'params': {'block_size': 4.0}}])
+    assert [name for name, _ in resolved] == ['sketch', 'glitch', 'pixel_art']
+    assert resolved[1][1]['noise'] == 10
+    assert resolved[2][1]['block_size'] == 4
+
+
+def test_longest_allowed_chain_resolves(processor):
+    assert len(processor.resolve_chain(['pixel_art'] * MAX_CHAIN_STEPS)) == MAX_CHAIN_STEPS
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from procedural import GENERATOR_STYLES, MAX_CANVAS, ProceduralGenerator, prompt_seed
+
+
+@pytest.fixture
+def generator():
+    return ProceduralGenerator(tile_size=32, workers=2)
+
+
+def pixels(image):
+    return np.asarray(image)
+
+
+def test_prompt_seed_is_stable():
+    # Unlike hash(), the seed must not change between processes
+    assert prompt_seed('a misty lake') == prompt_seed('a misty lake')
+    assert prompt_seed('a misty lake') != prompt_seed('a misty lake.')
+
+
+@pytest.mark.parametrize('style', list(GENERATOR_STYLES))
+def test_same_prompt_renders_the_same_picture(style):
+    first = ProceduralGenerator(tile_size=32).render('a misty lake', style, 70, 50)
+    second = ProceduralGenerator(tile_size=32).render('a misty lake', style, 70, 50)
+    other = ProceduralGenerator(tile_size=32).render('a stormy sea', style, 70, 50)
+
+    assert first.size == (70, 50) and first.mode == 'RGB'
+    assert np.array_equal(pixels(first), pixels(second))
+    assert not np.array_equal(pixels(first), pixels(other))
+
+
+def test_larger_canvas_extends_the_smaller_one(generator):
+    small = generator.render('dunes', 'nebula', 45, 37, zoom=1)
+    large = generator.render('dunes', 'nebula', 101, 90, zoom=1)
+    assert np.array_equal(pixels(large)[:37, :45], pixels(small))
+
+
+def test_tiles_join_seamlessly(generator):
+    # The same canvas from one big tile and from many small ones
+    whole = ProceduralGenerator(tile_size=128).render('dunes', 'marble', 100, 70)
+    tiled = generator.render('dunes', 'marble', 100, 70)
+    assert np.array_equal(pixels(whole), pixels(tiled))
+
+
+def test_repeated_render_is_served_from_cache(generator):
+    generator.render('dunes', 'clouds', 64, 64)
+    misses = generator.cache.info()['misses']
+    generator.render('dunes', 'clouds', 64, 64)
+    info = generator.cache.info()
+    assert info['misses'] == misses
+    assert info['hits'] == 4
+
+
+def test_default_cache_holds_a_largest_canvas():
+    generator = ProceduralGenerator()
+    tiles_per_canvas = (MAX_CANVAS // generator.tile_size) ** 2
+    assert generator.cache.max_tiles >= tiles_per_canvas
+
+
+@pytest.mark.parametrize('prompt, style, width, height, zoom', [
+    ('x', 'no_such_style', 10, 10, 0),
+    ('x', 'clouds', 0, 10, 0),
+    ('x', 'clouds', MAX_CANVAS + 1, 10, 0),
+    ('x', 'clouds', 10, 10, 2000),
+    ('x', 'clouds', 10, 10, -2000),
+    (['x'], 'clouds', 10, 10, 0),
+    (42, 'clouds', 10, 10, 0),
+])
+def test_invalid_requests_raise_value_error(generator, prompt, style, width, height, zoom):
+    with pytest.raises(ValueError):
+        generator.render(prompt, style, width, height, zoom)
@@ -0,0 +1,90 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+
+TOKEN = 'test-admin-token'
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # app creates its upload and result folders on import, so import it from a scratch directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('PROFILE_ADMIN_TOKEN', TOKEN)
+    monkeypatch.setenv('PROFILE_DIR', str(tmp_path / 'profiles'))
+    import app
+    monkeypatch.setitem(app.app.config, 'RESULTS_FOLDER', str(tmp_path))
+    return app.app.test_client()
+
+
+def generate(client, query='', token=None):
+    headers = {'X-Admin-Token': token} if token else {}
+    return client.post(f'/api/generate-from-text{query}', headers=headers,
+                       json={'prompt': 'a misty lake', 'style': 'clouds', 'width': 64, 'height': 64})
+
+
+def profile_files(tmp_path):
+    directory = tmp_path / 'profiles'
+    return sorted(os.listdir(directory)) if directory.exists() else []
+
+
+@pytest.mark.parametrize('token', [None, 'wrong-token'])
+def test_profile_without_admin_token_is_forbidden(client, tmp_path, token):
+    response = generate(client, '?profile=1', token)
+    assert response.status_code == 403
+    assert profile_files(tmp_path) == []
+
+
+def test_profile_without_configured_token_is_forbidden(client, tmp_path, monkeypatch):
+    monkeypatch.delenv('PROFILE_ADMIN_TOKEN')
+    assert generate(client, '?profile=1', TOKEN).status_code == 403
+
+
+def test_unprofiled_request_writes_nothing(client, tmp_path):
+    response = generate(client)
+    assert response.status_code == 200
+    assert 'profile' not in response.json
+    assert profile_files(tmp_path) == []
+
+
+def test_cprofile_writes_all_files(client, tmp_path):
+    response = generate(client, '?profile=1', TOKEN)
+    assert response.status_code == 200
+
+    profile = response.json['profile']
+    assert profile['mode'] == 'cprofile' and profile['requested']
+    assert profile['label'] == 'generate-from-text'
+    assert profile_files(tmp_path) == [f"{profile['id']}.{ext}" for ext in ('collapsed', 'json', 'pstats')]
+    assert (tmp_path / 'profiles' / f"{profile['id']}.collapsed").read_text().strip()
+
+
+def test_sampling_writes_collapsed_stacks(client, tmp_path):
+    image = io.BytesIO()
+    Image.new('RGB', (96, 64), 'teal').save(image, 'PNG')
+    image.seek(0)
+    response = client.post('/api/apply-style?profile=sample', headers={'X-Admin-Token': TOKEN},
+                           data={'image': (image, 'in.png'), 'style': 'oil_painting'})
+    assert response.status_code == 200
+
+    profile = response.json['profile']
+    assert profile['mode'] == 'sample' and profile['formats'] == ['collapsed']
+    assert profile_files(tmp_path) == [f"{profile['id']}.collapsed", f"{profile['id']}.json"]
+
+
+def test_listing_and_download_need_the_token(client):
+    profile_id = generate(client, '?profile=1', TOKEN).json['profile']['id']
+
+    assert client.get('/api/profiles').status_code == 403
+    assert client.get(f'/api/profiles/{profile_id}.pstats').status_code == 403
+
+    listing = client.get('/api/profiles', headers={'X-Admin-Token': TOKEN})
+    assert [entry['id'] for entry in listing.json['profiles']] == [profile_id]
+
+    download = client.get(f'/api/profiles/{profile_id}.collapsed', headers={'X-Admin-Token': TOKEN})
+    assert download.status_code == 200 and download.data
+
+
+@pytest.mark.parametrize('path', ['/api/profiles/nope.pstats', '/api/profiles/20260101_000000_000000_abcd.txt'])
+def test_unknown_profile_is_not_found(client, path):
+    assert client.get(path, headers={'X-Admin-Token': TOKEN}).status_code == 404
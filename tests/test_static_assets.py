@@ -0,0 +1,89 @@
+import gzip
+
+import pytest
+
+from static_assets import StaticAsset, brotli
+
+BODY = '<html>' + 'hello asset ' * 200 + '</html>'
+
+
+@pytest.fixture
+def asset():
+    return StaticAsset(BODY, 'text/html; charset=utf-8')
+
+
+def test_identity_without_accept_encoding(asset):
+    status, headers, body = asset.respond()
+    assert status == 200
+    assert body == BODY.encode()
+    assert 'Content-Encoding' not in headers
+    assert headers['Content-Length'] == str(len(body))
+    assert headers['Vary'] == 'Accept-Encoding'
+
+
+def test_gzip_when_accepted(asset):
+    status, headers, body = asset.respond('gzip, deflate')
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(body) == BODY.encode()
+
+
+@pytest.mark.skipif(brotli is None, reason="brotli not installed")
+def test_brotli_preferred_over_gzip(asset):
+    status, headers, body = asset.respond('gzip, br')
+    assert headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(body) == BODY.encode()
+
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('gzip;q=0', None),
+    ('br;q=0, gzip', 'gzip'),
+    ('br;q=0, gzip;q=0', None),
+    ('GZIP;q=0.5', 'gzip'),
+    ('gzip;q=bogus', None),
+    ('identity', None),
+])
+def test_q_zero_refuses_a_coding(asset, accept_encoding, expected):
+    assert asset.choose_encoding(accept_encoding) == expected
+
+
+def test_wildcard_accepts_best_available(asset):
+    assert asset.choose_encoding('*') == ('br' if brotli is not None else 'gzip')
+
+
+def test_each_encoding_has_its_own_etag(asset):
+    etags = {headers['ETag'] for _, headers, _ in
+             (asset.respond(None), asset.respond('gzip'))}
+    assert len(etags) == 2
+
+
+@pytest.mark.parametrize('if_none_match', [None, '"other"'])
+def test_non_matching_etag_gets_full_response(asset, if_none_match):
+    status, _, body = asset.respond('gzip', if_none_match)
+    assert status == 200 and body
+
+
+def test_matching_etag_gets_304(asset):
+    _, headers, _ = asset.respond('gzip')
+    etag = headers['ETag']
+
+    for if_none_match in (etag, f'W/{etag}', f'"other", {etag}', '*'):
+        status, not_modified, body = asset.respond('gzip', if_none_match)
+        assert status == 304
+        assert body == b''
+        assert not_modified['ETag'] == etag
+        assert 'Content-Length' not in not_modified
+
+
+def test_etag_is_per_representation(asset):
+    _, headers, _ = asset.respond(None)
+    status, _, _ = asset.respond('gzip', headers['ETag'])
+    assert status == 200
+
+
+def test_json_asset_is_stable():
+    first = StaticAsset.from_json({'b': 1, 'a': 2}, cache_control='public, max-age=300')
+    second = StaticAsset.from_json({'a': 2, 'b': 1})
+    assert first.respond()[1]['ETag'] == second.respond()[1]['ETag']
+    assert first.respond()[1]['Cache-Control'] == 'public, max-age=300'
+    assert first.respond()[1]['Content-Type'] == 'application/json'
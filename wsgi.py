@@ -0,0 +1,21 @@
+"""Production WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+With preload_app (see gunicorn.conf.py) this module is imported once in the
+gunicorn master. Everything loaded here - NumPy, PIL, the image processor
+and whatever warm_up() caches - is then shared copy-on-write by the forked
+workers instead of being loaded again in each one.
+"""
+import gc
+
+from app import app, warm_up
+
+warm_up()
+
+# Move everything loaded so far out of the garbage collector's view, so
+# collections in the workers don't touch (and un-share) these pages
+gc.collect()
+gc.freeze()
+
+application = app